@@ -0,0 +1,45 @@
+"""Local search version of 100_instances_sorted.py for the instances that are too large for the MIP.
+
+Every instance gets a coloring; it is only proven optimal when it reaches the clique bound.
+"""
+
+from coloring_solver import vertex_color_dict
+from instance_io import load_instance
+from reporting import show
+from tabucol import local_search_coloring
+
+with open("instance_list100.txt", "r") as file:
+    filenames = file.read().splitlines()
+
+with open("instances(tabucol output).txt", "w") as output_file:
+
+    for filename in filenames:
+        instance = load_instance(filename)
+        vertices = list(range(1, instance.num_vertices + 1))
+        colors = list(range(1, instance.num_vertices + 1))
+        edges = instance.edges
+
+        show("vertices", vertices)
+        show("colors", colors)
+        show("edges", edges)
+
+        # Tabu search with k-decrement from the greedy coloring
+        coloring, optimal, lower_bound = local_search_coloring(len(vertices), edges, time_limit=1800)  # 1800 seconds = 30 minutes
+
+        if optimal:
+            print("THE PROBLEM HAS AN OPTIMAL SOLUTION ")
+        else:
+            print("Best coloring found; clique bound = ", lower_bound)
+        output_file.write(f"File Name: {filename} - ")
+
+        colors_used = [colors[c] for c in sorted(set(coloring))]
+        show("colors used", colors_used)
+        output_file.write(f"Colors used = {colors_used} - ")
+        print("total no of colors used = ", len(colors_used))
+
+        vertex_color = vertex_color_dict(coloring, vertices, colors)
+
+        show("vertex colors", vertex_color)
+        print("Objective value = ", len(colors_used))
+        output_file.write(f"Vertex Color: {vertex_color} - ")
+        output_file.write(f"Objective value: {float(len(colors_used))}\n")
@@ -1,54 +1,31 @@
 import gurobipy as gp
 from gurobipy import GRB
+from coloring_model import build_coloring_model, set_mip_start, add_symmetry_breaking, dense_coloring, used_colors
+from heuristics import greedy_coloring, color_bound, greedy_clique, relabel_colors
+from instance_io import load_instance
+from coloring_solver import vertex_color_dict
+from reporting import VERBOSE, show, dump_solution
 
 try:
     filename = input("Enter the name of file to open: ")
-    with open(filename, 'r') as file:
-        no_of_vertices = []
-        for line in file:
-            if line.startswith('p'):
-                words = line.split()
-                no_of_vertices.append(words[2])
-    vertices = list(range(1, int(no_of_vertices[0]) + 1))
-    colors = list(range(1, int(no_of_vertices[0]) + 1))
+    instance = load_instance(filename)
+    vertices = list(range(1, instance.num_vertices + 1))
+    colors = list(range(1, instance.num_vertices + 1))
+    edges = instance.edges
 
-    with open(filename, 'r') as file:
-        edges = []
-        for lines in file:
-            if lines.startswith('e'):
-                num = lines.split()[1:]
-                edge = tuple(map(int, num))
-                edges.append(edge)
+    show("vertices", vertices)
+    show("colors", colors)
+    show("edges", edges)
 
-    print("vertices =", vertices)
-    print("colors =", colors)
-    print("edges =", edges)
+    # Heuristics: upper bound on the colors, MIP start and clique lower bound
+    coloring = greedy_coloring(len(vertices), edges)
+    colors = colors[:color_bound(coloring)]
+    clique = greedy_clique(len(vertices), edges)
 
     # Model
-    vc = gp.Model("VCP")
-
-    # Variables
-    x = []
-    for v in vertices:
-        x.append([vc.addVar(vtype=GRB.BINARY, name="X" + str(v) + " " + str(c)) for c in colors])
-    y = []
-    for c in colors:
-        y.append(vc.addVar(vtype=GRB.BINARY, name="Y" + str(c)))
-
-    # Constraints
-    # C1
-    for v in range(len(vertices)):
-        vc.addConstr(gp.quicksum(x[v][c] for c in range(len(colors))) == 1)
-
-    # C2
-    for v1 in range(len(vertices)):
-        for v2 in range(len(vertices)):
-            if (v1, v2) in edges:
-                for c in range(len(colors)):
-                    vc.addConstr(x[v1][c] + x[v2][c] <= y[c])
-
-    # Objective
-    vc.setObjective(gp.quicksum(y[c] for c in range(len(colors))), GRB.MINIMIZE)
+    vc, x, y = build_coloring_model(len(vertices), edges, len(colors), names=VERBOSE)
+    order = add_symmetry_breaking(vc, x, y, clique)
+    set_mip_start(x, y, relabel_colors(coloring, order))
 
     #optimize
     vc.optimize()
@@ -64,24 +41,16 @@ try:
             print("THE SOLUTION:")
             output.write("THE SOLUTION:\n")
 
-            colors_used = []
-            for c in range(len(colors)):
-                if y[c].X == 1:
-                    colors_used.append(colors[c])
-            print("Colors used =", colors_used)
+            colors_used = [colors[c] for c in used_colors(y.X)]
+            show("Colors used", colors_used)
             print("Total number of colors used =", len(colors_used))
             output.write("Colors used = {}\n".format(colors_used))
             output.write("Total number of colors used = {}\n".format(len(colors_used)))
 
-            vertex_color = {}
-            for v in range(len(vertices)):
-                for c in range(len(colors)):
-                    if x[v][c].X == 1:
-                        if colors[c] not in vertex_color:
-                            vertex_color[colors[c]] = []
-                        vertex_color[colors[c]].append(vertices[v])
+            vertex_color = vertex_color_dict(dense_coloring(x.X), vertices, colors)
             for c, v in vertex_color.items():
-                print("Color", c, "-", "Vertices:", v)
+                if VERBOSE:
+                    print("Color", c, "-", "Vertices:", v)
                 output.write("Color {} - Vertices: {}\n".format(c, v))
 
             print('Objective value (total number of colors used to color the graph) = %g' % vc.ObjVal)
@@ -92,9 +61,7 @@ try:
         print("No optimal solution for the problem")
 
 
-    for v in vc.getVars():
-        print('%s %g' % (v.VarName, v.X))
-    print('Obj: %g' % vc.ObjVal)
+    dump_solution(vc)
 
 except gp.GurobiError as e:
     print('Error code ' + str(e.errno) + ': ' + str(e))
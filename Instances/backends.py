@@ -0,0 +1,106 @@
+"""Solver-independent MIPs: one sparse matrix model, solved by Gurobi or HiGHS.
+
+A Problem is the model in matrix form, the same data scipy.optimize.milp
+takes:
+
+    min  c @ x
+    s.t. row_lb <= A @ x <= row_ub
+         lb <= x <= ub,  x[i] integer where integrality[i] is 1
+
+solve_problem hands it either to Gurobi (addMVar / addMConstr) or to HiGHS
+through scipy.optimize.milp, so machines without a Gurobi license can still
+take the smaller instances, and both solvers can be benchmarked on identical
+matrices.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+import scipy.sparse as sp
+from scipy.optimize import milp, Bounds, LinearConstraint
+
+Problem = namedtuple("Problem", ["c", "A", "row_lb", "row_ub", "lb", "ub", "integrality"])
+Result = namedtuple("Result", ["status", "x", "objective", "bound"])
+
+BACKENDS = ("gurobi", "highs")
+
+
+def stack_rows(blocks):
+    """Stack (A, row_lb, row_ub) blocks into one block."""
+    A = sp.vstack([b[0] for b in blocks], format="csr")
+    return A, np.concatenate([b[1] for b in blocks]), np.concatenate([b[2] for b in blocks])
+
+
+def gurobi_available():
+    """True if gurobipy is installed and a license can be checked out."""
+    try:
+        import gurobipy as gp
+        with gp.Env(params={"OutputFlag": 0}):
+            return True
+    except Exception:
+        return False
+
+
+def solve_problem(problem, backend="gurobi", time_limit=None, threads=0, output=False, start=None):
+    """Solve a Problem and return a Result.
+
+    status is "optimal", "time_limit", "infeasible" or the solver's own status
+    code; x is None when no feasible solution was found. backend "auto" takes
+    Gurobi when a license is available and HiGHS otherwise. start is a MIP
+    start, used by Gurobi only.
+    """
+    if backend == "auto":
+        backend = "gurobi" if gurobi_available() else "highs"
+    if backend == "gurobi":
+        return _solve_gurobi(problem, time_limit, threads, output, start)
+    if backend == "highs":
+        return _solve_highs(problem, time_limit, output)
+    raise ValueError(f"unknown backend {backend!r}, expected one of {BACKENDS}")
+
+
+def _solve_gurobi(problem, time_limit, threads, output, start):
+    import gurobipy as gp
+    from gurobipy import GRB
+
+    m = gp.Model()
+    m.setParam(GRB.Param.OutputFlag, int(output))
+    m.setParam(GRB.Param.Threads, threads)
+    if time_limit is not None:
+        m.setParam(GRB.Param.TimeLimit, time_limit)
+
+    inf = GRB.INFINITY
+    vtype = np.where(np.asarray(problem.integrality) > 0, GRB.INTEGER, GRB.CONTINUOUS)
+    x = m.addMVar(len(problem.c), lb=np.maximum(problem.lb, -inf), ub=np.minimum(problem.ub, inf), vtype=vtype)
+    A = sp.csr_matrix(problem.A)
+    lo, hi = np.asarray(problem.row_lb, dtype=float), np.asarray(problem.row_ub, dtype=float)
+    eq = lo == hi
+    le = np.isfinite(hi) & ~eq
+    ge = np.isfinite(lo) & ~eq
+    for rows, sense, rhs in ((eq, '=', hi), (le, '<', hi), (ge, '>', lo)):
+        if rows.any():
+            m.addMConstr(A[rows], x, sense, rhs[rows])
+    m.setObjective(np.asarray(problem.c) @ x, GRB.MINIMIZE)
+    if start is not None:
+        x.Start = start
+    m.optimize()
+
+    status = {GRB.OPTIMAL: "optimal", GRB.TIME_LIMIT: "time_limit", GRB.INFEASIBLE: "infeasible"}.get(m.status, m.status)
+    if m.SolCount == 0:
+        return Result(status, None, None, m.ObjBound if m.status == GRB.TIME_LIMIT else None)
+    return Result(status, x.X, m.ObjVal, m.ObjBound)
+
+
+def _solve_highs(problem, time_limit, output):
+    options = {"disp": output}
+    if time_limit is not None:
+        options["time_limit"] = time_limit
+    res = milp(problem.c,
+               integrality=problem.integrality,
+               bounds=Bounds(problem.lb, problem.ub),
+               constraints=LinearConstraint(problem.A, problem.row_lb, problem.row_ub),
+               options=options)
+    status = {0: "optimal", 1: "time_limit", 2: "infeasible"}.get(res.status, res.status)
+    bound = getattr(res, "mip_dual_bound", None)
+    if res.x is None:
+        return Result(status, None, None, bound)
+    return Result(status, res.x, res.fun, res.fun if status == "optimal" and bound is None else bound)
@@ -0,0 +1,333 @@
+"""Solve an instance list in parallel and export the results to a CSV file.
+
+    python batch_runner.py "combined list coloring files.txt" "Result (tableform).csv" --time-limit 1800
+    python batch_runner.py instance_list100.txt "Result 100.csv" --workers 8
+
+Instances are handed to a process pool, largest first, and the machine's cores
+are split between the concurrent solves through Gurobi's Threads parameter.
+Each result is written to an SQLite store (see results_store.py) as soon as
+its instance finishes, so a run that crashes or is preempted can simply be
+started again: it skips the instances that already finished. The CSV, in the
+same schema as "30 list coloring.py", is exported from the store. Phase times, peak memory, model sizes and the
+incumbent/bound progress of every instance go to a JSONL file next to the CSV
+(see instrumentation.py).
+
+    python batch_runner.py "combined list coloring files.txt" "Result.csv" --tiers 1800 3600
+
+runs the instances in tiers of increasing (cumulative) time limits; later
+tiers only resume the instances that are not optimal yet (see tiers.py).
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import gurobipy as gp
+from gurobipy import GRB
+from coloring_model import build_list_coloring_model, set_list_mip_start, add_symmetry_breaking, pair_coloring, used_colors
+from coloring_solver import solve_reduced, vertex_color_dict
+from heuristics import dsatur, greedy_clique
+from instance_io import load_instance, color_lists
+from graph_cache import CACHE_PATH, MAX_BYTES, GraphCache
+from instrumentation import RunLog, write_record
+from precheck import INFEASIBLE, check_lists
+from reporting import gap_percent
+from results_store import ResultStore
+from tiers import state_base, load_state, save_state, model_state, warm_start, remaining
+
+FIELDNAMES = ["File Name", "Colors Used", "Total Colors Used", "Vertex Color", "Objective Value", "Time Taken", "Gap Percentage"]
+STATUS_FIELDNAMES = ["File Name", "Status"]
+
+
+def available_cores():
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def instance_size(instance):
+    """Rough model size (x variables plus conflict rows) used to order the batch."""
+    return instance.num_vertices * (instance.num_vertices + len(instance.edges))
+
+
+def file_size(filename):
+    """instance_size of a file, 0 if it cannot be read (its worker will store the error)."""
+    try:
+        return instance_size(load_instance(filename))
+    except (OSError, ValueError):
+        return 0
+
+
+def solve_file(filename, time_limit, threads, symmetry_breaking=True, clique_cover=False, engine="assignment",
+               backend="gurobi", state_dir=None, tier=1, cache_path=None, cache_bytes=MAX_BYTES, lazy=False):
+    """Solve one instance file and return its CSV row and its instrumentation record.
+
+    With a state_dir, the solve resumes from the state an earlier tier left
+    in it, and leaves its own state there for the next tier. With a
+    cache_path, an optimal coloring cached for the same graph (up to
+    relabelling) is reused without a solve, and new optimal colorings are
+    added to the cache (see graph_cache.py). lazy generates the conflict
+    rows of plain coloring MIPs on demand (see coloring_model.LazyConflicts).
+    """
+    run = RunLog(filename)
+    start_time = time.time()
+    base = state_base(state_dir, filename) if state_dir else None
+    with run.phase("parse"):
+        instance = load_instance(filename)
+    vertices = list(range(instance.vertex_offset, instance.vertex_offset + instance.num_vertices))
+    colors = list(range(instance.vertex_offset, instance.vertex_offset + instance.num_vertices))
+    cache = GraphCache(cache_path, cache_bytes) if cache_path else None
+    try:
+        with run.phase("cache"):
+            cached = cache.lookup(instance) if cache else None
+        if cached is not None:
+            row = coloring_row(filename, cached.tolist(), vertices, colors, time.time() - start_time)
+            if base:
+                # solved for good: later tiers must not submit it again
+                save_state(base, {"tier": tier, "time": row["Time Taken"], "bound": len(set(cached[cached >= 0].tolist())),
+                                  "optimal": True, "coloring": [int(c) for c in cached]})
+        elif instance.listed.any():
+            row, coloring = solve_list_coloring(filename, instance, vertices, colors, time_limit, threads,
+                                                symmetry_breaking, run, base, tier)
+        else:
+            row, coloring = solve_plain_coloring(filename, instance, vertices, colors, time_limit, threads,
+                                                 symmetry_breaking, clique_cover, engine, backend, run, base, tier, lazy)
+        if cache and cached is None and "Status" not in row:
+            with run.phase("cache"):
+                cache.store(instance, coloring)
+    finally:
+        if cache:
+            cache.close()
+    run.record["cache"] = "hit" if cached is not None else "miss" if cache else None
+    run.record["status"] = row.get("Status", "optimal")
+    run.record["objective"] = row.get("Objective Value")
+    return row, run.finish()
+
+
+def solve_plain_coloring(filename, instance, vertices, colors, time_limit, threads, symmetry_breaking, clique_cover,
+                         engine, backend, run, base=None, tier=1, lazy=False):
+    state = load_state(base) if base else None
+    spent = state["time"] if state else 0.0
+
+    # Plain coloring: reduce the graph and solve every component as its own MIP
+    start_time = time.time()
+    coloring, optimal, lower_bound = solve_reduced(len(vertices), instance.edges, time_limit, threads,
+                                                   symmetry_breaking=symmetry_breaking, output=False, clique_cover=clique_cover,
+                                                   engine=engine, backend=backend, run=run, lazy=lazy,
+                                                   start=state and state["coloring"], lower_bound=state["bound"] if state else 0)
+    time_taken = spent + time.time() - start_time
+    if base:
+        save_state(base, {"tier": tier, "time": time_taken, "bound": lower_bound, "optimal": optimal,
+                          "coloring": [int(c) for c in coloring]})
+
+    if not optimal:
+        return {"File Name": filename, "Status": "No optimal solution for the problem"}, None
+    return coloring_row(filename, coloring, vertices, colors, time_taken), coloring
+
+
+def coloring_row(filename, coloring, vertices, colors, time_taken):
+    """CSV row of an optimal coloring (color index per vertex, -1 for uncolored vertices)."""
+    colors_used = [colors[c] for c in sorted(set(coloring)) if c >= 0]
+    return {
+        "File Name": filename,
+        "Colors Used": colors_used,
+        "Total Colors Used": len(colors_used),
+        "Vertex Color": vertex_color_dict(coloring, vertices, colors),
+        "Objective Value": float(len(colors_used)),
+        "Time Taken": time_taken,
+        "Gap Percentage": 0.0
+    }
+
+
+def solve_list_coloring(filename, instance, vertices, colors, time_limit, threads, symmetry_breaking=True, run=None,
+                        base=None, tier=1):
+    run = run or RunLog(filename)
+    state = load_state(base) if base else None
+    spent = state["time"] if state else 0.0
+    list_coloring = color_lists(instance)
+
+    # Precheck: propagate the lists and reject instances that cannot be colored
+    with run.phase("precheck"):
+        list_coloring, infeasible = check_lists(len(vertices), instance.edges, list_coloring)
+    if infeasible:
+        if base:
+            # nothing left for a later tier to solve
+            save_state(base, {"tier": tier, "time": spent, "bound": 0, "optimal": True, "coloring": None})
+        return {"File Name": filename, "Status": INFEASIBLE + ": " + infeasible}, None
+
+    # Heuristic list coloring as MIP start
+    with run.phase("heuristics"):
+        coloring = dsatur(len(vertices), instance.edges, list_coloring, len(colors))
+        clique = greedy_clique(len(vertices), instance.edges) if symmetry_breaking else ()
+
+    with run.phase("build"):
+        vc, x, y, var_vertex, var_color = build_list_coloring_model(len(vertices), instance.edges, len(colors), list_coloring)
+        if symmetry_breaking:
+            add_symmetry_breaking(vc, x, y, clique, list_coloring)
+        if coloring is not None:
+            set_list_mip_start(x, y, coloring, var_vertex, var_color)
+        if state:
+            warm_start(vc, y, base, state)
+        vc.setParam(GRB.Param.LogToConsole, 0)
+        vc.setParam(GRB.Param.Threads, threads)
+        vc.setParam(GRB.Param.TimeLimit, time_limit)
+    start_time = time.time()
+    run.optimize(vc)
+    time_taken = spent + time.time() - start_time
+    if base:
+        coloring = pair_coloring(x.X, var_vertex, var_color, len(vertices)) if vc.SolCount else None
+        save_state(base, model_state(vc, tier, time_taken, coloring), vc)
+
+    if vc.status == GRB.INFEASIBLE:
+        return {"File Name": filename, "Status": INFEASIBLE + ": proven by the MIP"}, None
+    if vc.status != GRB.OPTIMAL:
+        return {"File Name": filename, "Status": "No optimal solution for the problem"}, None
+
+    with run.phase("extract"):
+        colors_used = [colors[c] for c in used_colors(y.X)]
+        coloring = pair_coloring(x.X, var_vertex, var_color, len(vertices))
+        vertex_color = vertex_color_dict(coloring, vertices, colors)
+
+    return {
+        "File Name": filename,
+        "Colors Used": colors_used,
+        "Total Colors Used": len(colors_used),
+        "Vertex Color": vertex_color,
+        "Objective Value": vc.ObjVal,
+        "Time Taken": time_taken,
+        "Gap Percentage": gap_percent(vc.ObjVal, vc.ObjBound)
+    }, coloring
+
+
+def store_file(store_path, filename, time_limit, threads, symmetry_breaking=True, clique_cover=False, engine="assignment",
+               backend="gurobi", state_dir=None, tier=1, final=True, cache_path=None, cache_bytes=MAX_BYTES, lazy=False):
+    """solve_file in a worker process, with its result written straight to the store.
+
+    Returns (row, record, status). An exception is stored as the file's error
+    instead of ending the batch. final is False in all but the last tier, where
+    an instance that is not optimal yet is left pending.
+    """
+    with ResultStore(store_path) as store:
+        store.start(filename)
+        try:
+            row, record = solve_file(filename, time_limit, threads, symmetry_breaking, clique_cover, engine, backend,
+                                     state_dir, tier, cache_path, cache_bytes, lazy)
+        except gp.GurobiError as e:
+            row = {"File Name": filename, "Status": 'Error code ' + str(e.errno) + ': ' + str(e)}
+            record, status = {"file": filename, "status": row["Status"]}, "error"
+        except Exception as e:
+            row = {"File Name": filename, "Status": type(e).__name__ + ': ' + str(e)}
+            record, status = {"file": filename, "status": row["Status"]}, "error"
+        else:
+            if "Status" not in row:
+                status = "optimal"
+            elif row["Status"].startswith(INFEASIBLE):
+                status = "infeasible"
+            else:
+                status = "not_optimal" if final else "pending"
+        record["tier"] = tier
+        store.save(filename, status, row, record)
+    return row, record, status
+
+
+def export_csv(store_path, csv_path):
+    with ResultStore(store_path) as store:
+        store.export_csv(csv_path, FIELDNAMES, STATUS_FIELDNAMES)
+
+
+def run_batch(list_file, csv_path, time_limit=1800, workers=None, cores=None, symmetry_breaking=True, clique_cover=False,
+              engine="assignment", backend="gurobi", log_path=None, tiers=None, state_dir=None, store_path=None,
+              cache_path=CACHE_PATH, cache_bytes=MAX_BYTES, lazy=False):
+    """Solve every file named in list_file that the store has no final result for, and export csv_path.
+
+    Results go to the SQLite store at store_path, by default csv_path with a
+    .db extension, and csv_path is exported from it at the end, also when
+    the run is interrupted. The instrumentation records are appended to
+    log_path, by default csv_path with a .jsonl extension. With tiers, a list
+    of cumulative time limits, time_limit is ignored; an instance is final
+    once it is solved to optimality or after the last tier. The tiers keep
+    their state in state_dir, by default the store's name with a .tiers
+    extension, so a batch for another CSV starts from scratch. Optimal colorings
+    are shared between copies of the same graph through the cache at
+    cache_path (None to disable it), bounded to cache_bytes. With lazy the
+    plain coloring MIPs start from a seed of their conflict rows.
+    """
+    log_path = log_path or os.path.splitext(csv_path)[0] + ".jsonl"
+    store_path = store_path or os.path.splitext(csv_path)[0] + ".db"
+    state_dir = state_dir or os.path.splitext(store_path)[0] + ".tiers"
+    with open(list_file, "r") as file:
+        filenames = [name for name in file.read().splitlines() if name.strip()]
+    with ResultStore(store_path) as store:
+        finished = store.finished()
+    skipped = [filename for filename in filenames if filename in finished]
+    if skipped:
+        print(f"{len(skipped)} instances already finished in {store_path}, skipped")
+    filenames = [filename for filename in filenames if filename not in finished]
+
+    # largest instances first, so the long solves do not end up as stragglers
+    sizes = {filename: file_size(filename) for filename in filenames}
+    filenames.sort(key=sizes.get, reverse=True)
+
+    cores = cores or available_cores()
+    workers = max(1, min(workers or cores // 4, len(filenames) or 1, cores))
+    threads = max(1, cores // workers)
+
+    limits = tiers or [time_limit]
+    results = []
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for tier, limit in enumerate(limits, 1):
+                if tiers:
+                    todo = remaining(filenames, state_dir, limit)
+                    print(f"tier {tier}: {len(todo)} instances, up to {limit} s in total each")
+                else:
+                    todo = [(filename, time_limit) for filename in filenames]
+                final = tier == len(limits)
+                futures = [pool.submit(store_file, store_path, filename, limit, threads, symmetry_breaking, clique_cover,
+                                       engine, backend, state_dir if tiers else None, tier, final, cache_path, cache_bytes, lazy)
+                           for filename, limit in todo]
+                for future in as_completed(futures):
+                    result_instance, record, status = future.result()
+                    print(result_instance["File Name"], "-", result_instance.get("Status", result_instance.get("Objective Value")))
+                    write_record(log_path, record)
+                    if status != "pending":
+                        results.append(result_instance)
+    finally:
+        export_csv(store_path, csv_path)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("list_file", help="text file with one instance file name per line")
+    parser.add_argument("csv_file", help="CSV file the results are exported to")
+    parser.add_argument("--time-limit", type=float, default=1800, help="Gurobi TimeLimit per instance, in seconds")
+    parser.add_argument("--workers", type=int, default=None, help="concurrent solves (default: cores // 4)")
+    parser.add_argument("--cores", type=int, default=None, help="cores to share between the solves (default: all)")
+    parser.add_argument("--no-symmetry-breaking", action="store_true", help="skip the clique fixing and color ordering constraints")
+    parser.add_argument("--clique-cover", action="store_true", help="one conflict row per clique and color instead of per edge and color")
+    parser.add_argument("--lazy", action="store_true",
+                        help="add the conflict rows of plain coloring MIPs lazily, from a seed subset (dense graphs)")
+    parser.add_argument("--engine", choices=["assignment", "colgen", "tabucol", "partialcol", "portfolio"], default="assignment",
+                        help="formulation for plain coloring instances (list coloring always uses the assignment model)")
+    parser.add_argument("--backend", choices=["gurobi", "highs", "auto"], default="gurobi",
+                        help="MIP solver for the assignment engine on plain coloring instances; auto picks HiGHS without a Gurobi license")
+    parser.add_argument("--log", default=None, help="JSONL file for the per-instance timing records (default: the CSV name with .jsonl)")
+    parser.add_argument("--tiers", type=float, nargs="+", default=None,
+                        help="cumulative time limits; each tier resumes the instances the previous one left unsolved")
+    parser.add_argument("--state-dir", default=None,
+                        help="where the tiers keep each instance's incumbent and bound (default: the store name with .tiers)")
+    parser.add_argument("--store", default=None, help="SQLite results store (default: the CSV name with .db)")
+    parser.add_argument("--export-only", action="store_true", help="only export the CSV from the store, without solving")
+    parser.add_argument("--cache", default=CACHE_PATH, help="cache of optimal colorings shared by isomorphic instances")
+    parser.add_argument("--no-cache", action="store_true", help="solve every instance, even if its graph is cached")
+    parser.add_argument("--cache-size", type=float, default=MAX_BYTES / 2 ** 20, help="cache size bound in MB")
+    args = parser.parse_args()
+    if args.export_only:
+        export_csv(args.store or os.path.splitext(args.csv_file)[0] + ".db", args.csv_file)
+    else:
+        run_batch(args.list_file, args.csv_file, args.time_limit, args.workers, args.cores, not args.no_symmetry_breaking,
+                  args.clique_cover, args.engine, args.backend, args.log, args.tiers, args.state_dir, args.store,
+                  None if args.no_cache else args.cache, int(args.cache_size * 2 ** 20), args.lazy)
@@ -0,0 +1,440 @@
+"""Shared model builder for the vertex coloring and list coloring MIPs.
+
+The scripts in this folder all solve the same assignment formulation
+
+    min  sum_c y[c]
+    s.t. sum_c x[v,c] = 1                 for every vertex v
+         x[u,c] + x[v,c] <= y[c]          for every edge (u, v) and color c
+
+This module builds it once, through gurobipy's matrix API, by walking the edge
+list a single time instead of testing every vertex pair against the edge list.
+
+On dense graphs most of the |E| x |C| conflict rows are slack at the optimum.
+build_coloring_model(lazy=True) starts from a small seed of them instead, and
+LazyConflicts adds the ones an incumbent violates from a MIPSOL callback.
+"""
+
+import numpy as np
+import scipy.sparse as sp
+import gurobipy as gp
+from gurobipy import GRB
+from backends import Problem, stack_rows
+
+
+def edge_array(edges):
+    """Return the edges as a deduplicated (m, 2) int array with u < v.
+
+    Self loops and repeated edges (DIMACS files often list both (u, v) and
+    (v, u)) are dropped.
+    """
+    e = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+    e = np.sort(e, axis=1)
+    e = e[e[:, 0] != e[:, 1]]
+    return np.unique(e, axis=0)
+
+
+def conflict_matrix(edges, num_vertices, num_colors):
+    """Sparse rows of x[u,c] + x[v,c] - y[c] <= 0 for every edge and color.
+
+    Columns follow the variable layout of build_coloring_model: x[v,c] is
+    column v * num_colors + c and y[c] is column num_vertices * num_colors + c.
+    """
+    e = edge_array(edges)
+    m = len(e)
+    c = np.tile(np.arange(num_colors), m)
+    u = np.repeat(e[:, 0], num_colors)
+    v = np.repeat(e[:, 1], num_colors)
+    rows = np.arange(m * num_colors)
+    data = np.concatenate([np.ones(2 * len(rows)), -np.ones(len(rows))])
+    row = np.concatenate([rows, rows, rows])
+    col = np.concatenate([u * num_colors + c, v * num_colors + c, num_vertices * num_colors + c])
+    return sp.csr_matrix((data, (row, col)), shape=(m * num_colors, (num_vertices + 1) * num_colors))
+
+
+def seed_edges(num_vertices, edges):
+    """The edges whose conflict rows a lazy model starts with.
+
+    One edge per vertex, to its neighbour of highest degree. Its rows also
+    tie x[v,c] <= y[c] for every vertex that has a neighbour.
+    """
+    e = edge_array(edges)
+    ends = np.concatenate([e[:, 0], e[:, 1]])
+    others = np.concatenate([e[:, 1], e[:, 0]])
+    degree = np.bincount(ends, minlength=num_vertices)
+    order = np.lexsort((-degree[others], ends))
+    first = order[np.r_[True, ends[order][1:] != ends[order][:-1]]] if len(order) else order
+    return edge_array(np.stack([ends[first], others[first]], axis=1))
+
+
+def edge_clique_cover(num_vertices, edges):
+    """Cover the edges with cliques, greedily.
+
+    Every still uncovered edge seeds a clique that is grown by the common
+    neighbour covering the most uncovered edges, until no candidate covers a
+    new one.
+    """
+    e = edge_array(edges).tolist()
+    adj = [set() for _ in range(num_vertices)]
+    for u, v in e:
+        adj[u].add(v)
+        adj[v].add(u)
+    uncovered = set(map(tuple, e))
+
+    def gain(w, clique):
+        return sum((min(w, k), max(w, k)) in uncovered for k in clique)
+
+    cliques = []
+    for u, v in e:
+        if (u, v) not in uncovered:
+            continue
+        clique = [u, v]
+        candidates = adj[u] & adj[v]
+        while candidates:
+            w = max(candidates, key=lambda t: gain(t, clique))
+            if gain(w, clique) == 0:
+                break
+            clique.append(w)
+            candidates &= adj[w]
+        for i, a in enumerate(clique):
+            for b in clique[i + 1:]:
+                uncovered.discard((min(a, b), max(a, b)))
+        cliques.append(clique)
+    return cliques
+
+
+def clique_matrix(cliques, num_vertices, num_colors):
+    """Sparse rows of sum_{v in K} x[v,c] - y[c] <= 0 for every clique K and color c.
+
+    Same column layout as conflict_matrix.
+    """
+    sizes = np.array([len(k) for k in cliques], dtype=np.int64)
+    members = np.fromiter((v for k in cliques for v in k), dtype=np.int64, count=sizes.sum())
+    clique_of = np.repeat(np.arange(len(cliques)), sizes)
+    c = np.tile(np.arange(num_colors), len(members))
+    x_row = np.repeat(clique_of, num_colors) * num_colors + c
+    x_col = np.repeat(members, num_colors) * num_colors + c
+    y_row = np.arange(len(cliques) * num_colors)
+    y_col = num_vertices * num_colors + np.tile(np.arange(num_colors), len(cliques))
+    data = np.concatenate([np.ones(len(x_row)), -np.ones(len(y_row))])
+    return sp.csr_matrix((data, (np.concatenate([x_row, y_row]), np.concatenate([x_col, y_col]))),
+                         shape=(len(cliques) * num_colors, (num_vertices + 1) * num_colors))
+
+
+def assignment_matrix(num_vertices, num_colors, list_coloring=None):
+    """Sparse rows of sum_c x[v,c] = 1.
+
+    Without list_coloring every vertex gets a row over all colors. With it,
+    only the listed vertices get a row, and only over their allowed colors.
+    """
+    if list_coloring is None:
+        vs = np.repeat(np.arange(num_vertices), num_colors)
+        cs = np.tile(np.arange(num_colors), num_vertices)
+        rows = vs
+    else:
+        keys = list(list_coloring.keys())
+        counts = [len(list_coloring[v]) for v in keys]
+        vs = np.repeat(np.asarray(keys, dtype=np.int64), counts)
+        cs = np.fromiter((c for v in keys for c in list_coloring[v]), dtype=np.int64, count=sum(counts))
+        rows = np.repeat(np.arange(len(keys)), counts)
+    data = np.ones(len(vs))
+    return sp.csr_matrix((data, (rows, vs * num_colors + cs)),
+                         shape=(rows.max() + 1 if len(rows) else 0, (num_vertices + 1) * num_colors))
+
+
+def name_variables(vc, x, y, var_vertex=None, var_color=None):
+    """Name the variables X[v,c] and Y[c], for debugging or LP export.
+
+    The builders leave the variables unnamed unless asked to: one Python
+    string per variable is most of the memory a large model takes on the
+    Python side. var_vertex and var_color give the pairs of
+    build_list_coloring_model's x; without them x is the vertex x color MVar
+    of build_coloring_model.
+    """
+    if var_vertex is None:
+        var_vertex, var_color = np.divmod(np.arange(x.size), x.shape[1])
+    vc.update()
+    labels = [f"X[{v},{c}]" for v, c in zip(var_vertex.tolist(), var_color.tolist())]
+    labels += [f"Y[{c}]" for c in range(y.shape[0])]
+    vc.setAttr("VarName", x.reshape(-1).tolist() + y.tolist(), labels)
+
+
+def build_coloring_model(num_vertices, edges, num_colors, list_coloring=None, names=False, model_name="VCP",
+                         clique_cover=False, lazy=False):
+    """Build the coloring MIP and return (model, x, y).
+
+    edges are 0-based vertex index pairs. list_coloring, if given, maps a vertex
+    index to the color indices it may take; the other x[v,c] of that vertex are
+    fixed to zero. x is a num_vertices x num_colors MVar and y an MVar over the
+    colors, both views of a single variable block. Variable names are only
+    generated when names is True (see name_variables).
+
+    With clique_cover the edges are covered by cliques and every clique K
+    gets one row sum_{v in K} x[v,c] <= y[c] per color instead of one row per
+    edge. That is fewer and tighter rows on dense graphs.
+
+    With lazy only the conflict rows of seed_edges are built (clique_cover is
+    then ignored); the model must be solved with LazyConstraints set and
+    LazyConflicts(x, y, edges).callback.
+    """
+    vc = gp.Model(model_name)
+
+    # Variables
+    ub = np.ones((num_vertices + 1) * num_colors)
+    if list_coloring is not None:
+        allowed = np.zeros((num_vertices, num_colors), dtype=bool)
+        allowed[[v for v in range(num_vertices) if v not in list_coloring], :] = True
+        for v, cs in list_coloring.items():
+            allowed[v, cs] = True
+        ub[:num_vertices * num_colors] = allowed.ravel()
+    z = vc.addMVar((num_vertices + 1) * num_colors, ub=ub, vtype=GRB.BINARY)
+    x = z[:num_vertices * num_colors].reshape(num_vertices, num_colors)
+    y = z[num_vertices * num_colors:]
+    if names:
+        name_variables(vc, x, y)
+
+    # Constraints
+    # C1
+    A = assignment_matrix(num_vertices, num_colors, list_coloring)
+    vc.addMConstr(A, z, '=', np.ones(A.shape[0]))
+
+    # C2
+    if lazy:
+        isolated = np.setdiff1d(np.arange(num_vertices), edge_array(edges).ravel())
+        B = sp.vstack([conflict_matrix(seed_edges(num_vertices, edges), num_vertices, num_colors),
+                       clique_matrix([[v] for v in isolated.tolist()], num_vertices, num_colors)]).tocsr()
+    elif clique_cover:
+        B = clique_matrix(edge_clique_cover(num_vertices, edges), num_vertices, num_colors)
+    else:
+        B = conflict_matrix(edges, num_vertices, num_colors)
+    vc.addMConstr(B, z, '<', np.zeros(B.shape[0]))
+
+    # Objective
+    vc.setObjective(y.sum(), GRB.MINIMIZE)
+
+    return vc, x, y
+
+
+class LazyConflicts:
+    """Conflict rows of build_coloring_model(lazy=True), added when an incumbent violates them."""
+
+    def __init__(self, x, y, edges):
+        self.x, self.y = x, y
+        self.edges = edge_array(edges)
+        self.added = 0
+
+    def callback(self, m, where):
+        """MIPSOL callback: x[u,c] + x[v,c] <= y[c] for every edge whose ends share color c."""
+        if where != GRB.Callback.MIPSOL:
+            return
+        coloring = dense_coloring(m.cbGetSolution(self.x))
+        u, v = self.edges[:, 0], self.edges[:, 1]
+        clash = np.flatnonzero((coloring[u] == coloring[v]) & (coloring[u] >= 0))
+        for i in clash.tolist():
+            c = coloring[u[i]]
+            m.cbLazy(self.x[u[i], c] + self.x[v[i], c] <= self.y[c])
+        self.added += len(clash)
+
+
+def set_mip_start(x, y, coloring):
+    """Pass a coloring (color index per vertex) to Gurobi as a MIP start."""
+    num_vertices, num_colors = x.shape
+    start = np.zeros((num_vertices, num_colors))
+    start[np.arange(num_vertices), coloring] = 1
+    x.Start = start
+    y.Start = start.max(axis=0)
+
+
+def symmetry_bounds(num_vertices, num_colors, clique=()):
+    """Variable bounds behind add_symmetry_breaking.
+
+    Returns (order, x_lb, x_ub, y_lb): the vertex order with the clique first,
+    and the bounds that fix the clique and allow the vertex at position p
+    only colors 0..p.
+    """
+    in_clique = set(clique)
+    order = list(clique) + [v for v in range(num_vertices) if v not in in_clique]
+    position = np.empty(num_vertices, dtype=np.int64)
+    position[order] = np.arange(num_vertices)
+    x_ub = (np.arange(num_colors)[None, :] <= position[:, None]).astype(float)
+    x_lb = np.zeros((num_vertices, num_colors))
+    x_lb[list(clique), np.arange(len(clique))] = 1
+    y_lb = (np.arange(num_colors) < len(clique)).astype(float)
+    return order, x_lb, x_ub, y_lb
+
+
+def coloring_problem(num_vertices, edges, num_colors, clique_cover=False, clique=None):
+    """The plain coloring MIP as a solver-independent backends.Problem.
+
+    Same variables and rows as build_coloring_model. With a clique, the bounds
+    and color ordering rows of add_symmetry_breaking are included as well.
+    """
+    num_x = num_vertices * num_colors
+    num_vars = num_x + num_colors
+    A = assignment_matrix(num_vertices, num_colors)
+    if clique_cover:
+        B = clique_matrix(edge_clique_cover(num_vertices, edges), num_vertices, num_colors)
+    else:
+        B = conflict_matrix(edges, num_vertices, num_colors)
+    blocks = [(A, np.ones(A.shape[0]), np.ones(A.shape[0])),
+              (B, np.full(B.shape[0], -np.inf), np.zeros(B.shape[0]))]
+    lb = np.zeros(num_vars)
+    ub = np.ones(num_vars)
+
+    if clique is not None:
+        _, x_lb, x_ub, y_lb = symmetry_bounds(num_vertices, num_colors, clique)
+        lb[:num_x] = x_lb.ravel()
+        ub[:num_x] = x_ub.ravel()
+        lb[num_x:] = y_lb
+        # y[c] - y[c+1] >= 0
+        k = max(num_colors - 1, 0)
+        D = sp.csr_matrix((np.concatenate([np.ones(k), -np.ones(k)]),
+                           (np.tile(np.arange(k), 2), num_x + np.concatenate([np.arange(k), np.arange(1, k + 1)]))),
+                          shape=(k, num_vars))
+        blocks.append((D, np.zeros(k), np.full(k, np.inf)))
+
+    c = np.zeros(num_vars)
+    c[num_x:] = 1
+    return Problem(c, *stack_rows(blocks), lb, ub, np.ones(num_vars))
+
+
+def add_symmetry_breaking(vc, x, y, clique=(), list_coloring=None):
+    """Clique fixing and color ordering for the plain coloring model.
+
+    The vertices are ordered with the clique first. Clique vertex i is fixed
+    to color i, colors are used in order (y[c] >= y[c+1]) and the vertex at
+    position p may only take colors 0..p. Every coloring can be renumbered to
+    satisfy this, and the fixed clique makes len(clique) the root bound, so the
+    solve stops as soon as a coloring of that size is found.
+
+    Color lists rule out renumbering, so with list_coloring only the bound
+    sum_c y[c] >= len(clique) is added; x may then also be the variable
+    vector of build_list_coloring_model. Returns the vertex order, or None with
+    list_coloring.
+    """
+    if list_coloring is not None:
+        # vertices without a list have no assignment row and may stay uncolored
+        size = sum(1 for v in clique if v in list_coloring)
+        if size:
+            vc.addConstr(y.sum() >= size)
+        return None
+
+    num_vertices, num_colors = x.shape
+    order, x_lb, x_ub, y_lb = symmetry_bounds(num_vertices, num_colors, clique)
+    x.LB = x_lb
+    x.UB = x_ub
+    y.LB = y_lb
+
+    if num_colors > 1:
+        vc.addConstr(y[:-1] >= y[1:])
+    return order
+
+
+def list_pairs(list_coloring, num_colors):
+    """(vertex, color) pairs allowed by the lists, sorted by vertex then color.
+
+    Raises ValueError for a listed color outside 0..num_colors - 1.
+    """
+    keys = sorted(list_coloring)
+    counts = [len(list_coloring[v]) for v in keys]
+    vs = np.repeat(np.asarray(keys, dtype=np.int64), counts)
+    cs = np.fromiter((c for v in keys for c in list_coloring[v]), dtype=np.int64, count=sum(counts))
+    bad = np.flatnonzero((cs < 0) | (cs >= num_colors))
+    if len(bad):
+        raise ValueError(f"vertex {vs[bad[0]]} lists color {cs[bad[0]]}, expected one of 0..{num_colors - 1}")
+    key = np.unique(vs * num_colors + cs)
+    return key // num_colors, key % num_colors
+
+
+def build_list_coloring_model(num_vertices, edges, num_colors, list_coloring, names=False, model_name="VCP"):
+    """Build the list coloring MIP over the allowed (vertex, color) pairs only.
+
+    Returns (model, x, y, var_vertex, var_color): x has one variable per allowed
+    pair, and var_vertex / var_color give the pair of each of them. An edge only
+    gets conflict rows for the colors both of its endpoints may take, and pairs
+    left without any conflict row get x[v,c] <= y[c] instead. Vertices
+    without a list get no variables and stay uncolored, as they have no
+    assignment row in build_coloring_model either.
+    """
+    var_vertex, var_color = list_pairs(list_coloring, num_colors)
+    num_pairs = len(var_vertex)
+    vc = gp.Model(model_name)
+
+    # Variables
+    z = vc.addMVar(num_pairs + num_colors, vtype=GRB.BINARY)
+    x = z[:num_pairs]
+    y = z[num_pairs:]
+    if names:
+        name_variables(vc, x, y, var_vertex, var_color)
+
+    # Constraints
+    # C1
+    rows = np.unique(var_vertex, return_inverse=True)[1]
+    A = sp.csr_matrix((np.ones(num_pairs), (rows, np.arange(num_pairs))), shape=(rows.max(initial=-1) + 1, num_pairs + num_colors))
+    vc.addMConstr(A, z, '=', np.ones(A.shape[0]))
+
+    # C2: match the pairs of both endpoints of every edge on (edge, color)
+    e = edge_array(edges)
+    ptr = np.searchsorted(var_vertex, np.arange(num_vertices + 1))
+    sides = []
+    for end in (e[:, 0], e[:, 1]):
+        lens = ptr[end + 1] - ptr[end]
+        first = np.repeat(ptr[end], lens)
+        var = first + np.arange(lens.sum()) - np.repeat(np.cumsum(lens) - lens, lens)
+        edge = np.repeat(np.arange(len(e)), lens)
+        sides.append((edge * num_colors + var_color[var], var))
+    key, iu, iv = np.intersect1d(sides[0][0], sides[1][0], assume_unique=True, return_indices=True)
+    m = len(key)
+    row = np.concatenate([np.arange(m)] * 3)
+    col = np.concatenate([sides[0][1][iu], sides[1][1][iv], num_pairs + key % num_colors])
+    data = np.concatenate([np.ones(2 * m), -np.ones(m)])
+    B = sp.csr_matrix((data, (row, col)), shape=(m, num_pairs + num_colors))
+    vc.addMConstr(B, z, '<', np.zeros(m))
+
+    # C3: x[v,c] <= y[c] for the pairs no conflict row ties to y[c]
+    free = np.ones(num_pairs, dtype=bool)
+    free[sides[0][1][iu]] = False
+    free[sides[1][1][iv]] = False
+    free = np.flatnonzero(free)
+    k = len(free)
+    L = sp.csr_matrix((np.concatenate([np.ones(k), -np.ones(k)]),
+                       (np.tile(np.arange(k), 2), np.concatenate([free, num_pairs + var_color[free]]))),
+                      shape=(k, num_pairs + num_colors))
+    vc.addMConstr(L, z, '<', np.zeros(k))
+
+    # Objective
+    vc.setObjective(y.sum(), GRB.MINIMIZE)
+
+    return vc, x, y, var_vertex, var_color
+
+
+def set_list_mip_start(x, y, coloring, var_vertex, var_color):
+    """MIP start for build_list_coloring_model from a color index per vertex."""
+    start = (var_color == np.asarray(coloring)[var_vertex]).astype(float)
+    x.Start = start
+    used = np.zeros(y.shape[0])
+    used[var_color[start > 0]] = 1
+    y.Start = used
+
+
+def pair_coloring(xval, var_vertex, var_color, num_vertices):
+    """Color index per vertex from the pair values, -1 for uncolored vertices."""
+    coloring = np.full(num_vertices, -1, dtype=np.int64)
+    chosen = xval > 0.5
+    coloring[var_vertex[chosen]] = var_color[chosen]
+    return coloring
+
+
+def dense_coloring(xval):
+    """Color index per vertex from the x values of build_coloring_model, -1 for uncolored vertices.
+
+    xval is x.X, read in one call; one argmax per row replaces walking x[v][c].
+    """
+    xval = np.asarray(xval)
+    coloring = xval.argmax(axis=1)
+    coloring[xval.max(axis=1, initial=0) < 0.5] = -1
+    return coloring
+
+
+def used_colors(yval):
+    """Indices of the colors with y[c] = 1, from y.X."""
+    return np.flatnonzero(np.asarray(yval) > 0.5)
@@ -0,0 +1,184 @@
+"""Plain vertex coloring pipeline: heuristics, reduction, components and the MIP.
+
+solve_reduced is what the batch scripts call for DIMACS instances. It bounds
+the chromatic number from both sides with the greedy heuristics, removes the
+vertices the reduction rules allow, and solves every connected component of
+what is left as its own MIP, possibly in parallel. The component colorings are
+put back together into one coloring of the whole graph.
+"""
+
+import math
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from gurobipy import GRB
+from backends import solve_problem, gurobi_available
+from coloring_model import build_coloring_model, LazyConflicts, set_mip_start, add_symmetry_breaking, coloring_problem
+from column_generation import solve_colgen
+from heuristics import greedy_coloring, color_bound, greedy_clique, relabel_colors
+from instrumentation import RunLog
+from portfolio import HeuristicRace, race_threads
+from reduction import reduce_graph, extend_coloring, components, induced_edges
+from tabucol import local_search_coloring
+
+
+def solve_coloring(num_vertices, edges, time_limit, threads=0, symmetry_breaking=True, output=True, clique_cover=False,
+                   backend="gurobi", run=None, start=None, race=False, lazy=False):
+    """Color one graph with the MIP. Returns (coloring, optimal, lower bound).
+
+    The MIP is skipped when the heuristic coloring already matches the clique
+    bound. backend is "gurobi", "highs" or "auto" (see backends.py); HiGHS gets
+    the same matrices but no MIP start. Phase times and solver progress go to
+    run, an instrumentation.RunLog, if one is given. start is a known coloring
+    with colors 0..k-1, e.g. from an earlier tier, used instead of the greedy
+    one when it has fewer colors. With race, a local search runs next to the
+    MIP on one of the threads and feeds it colorings (see portfolio.py).
+    With lazy, the conflict rows are added on demand (see
+    coloring_model.LazyConflicts); HiGHS always gets all of them. The seed
+    rows make a weak relaxation on their own, so lazy is meant to be used
+    together with symmetry_breaking.
+    """
+    run = run or RunLog()
+    with run.phase("heuristics"):
+        coloring = greedy_coloring(num_vertices, edges)
+        if start is not None and color_bound(start) < color_bound(coloring):
+            coloring = np.asarray(start)
+        num_colors = color_bound(coloring)
+        clique = greedy_clique(num_vertices, edges)
+    if len(clique) == num_colors:
+        return coloring, True, num_colors
+    if backend == "auto":
+        backend = "gurobi" if gurobi_available() else "highs"
+    if backend != "gurobi":
+        return solve_coloring_problem(num_vertices, edges, coloring, clique, time_limit, threads, symmetry_breaking,
+                                      output, clique_cover, backend, run)
+
+    with run.phase("build"):
+        vc, x, y = build_coloring_model(num_vertices, edges, num_colors, clique_cover=clique_cover, lazy=lazy)
+        order = None
+        if symmetry_breaking:
+            order = add_symmetry_breaking(vc, x, y, clique)
+            coloring = relabel_colors(coloring, order)
+        set_mip_start(x, y, coloring)
+        vc.setParam(GRB.Param.OutputFlag, int(output))
+        vc.setParam(GRB.Param.Threads, race_threads(threads) if race else threads)
+        vc.setParam(GRB.Param.TimeLimit, max(time_limit, 1))
+        vc.setParam(GRB.Param.LazyConstraints, int(lazy))
+    callbacks = []
+    if lazy:
+        conflicts = LazyConflicts(x, y, edges)
+        callbacks.append(conflicts.callback)
+    if race:
+        with HeuristicRace(num_vertices, edges, x, y, time_limit, len(clique), order) as racer:
+            run.optimize(vc, *callbacks, racer.callback)
+        run.record.setdefault("race", []).append(racer.summary())
+    else:
+        run.optimize(vc, *callbacks)
+    if lazy:
+        run.record.setdefault("lazy_rows", []).append(conflicts.added)
+
+    with run.phase("extract"):
+        if vc.SolCount:
+            coloring = x.X.argmax(axis=1)
+    bound = max(len(clique), math.ceil(vc.ObjBound - 1e-6))
+    return coloring, vc.status == GRB.OPTIMAL or bool(vc.SolCount) and vc.ObjVal < bound + 0.5, bound
+
+
+def solve_coloring_problem(num_vertices, edges, coloring, clique, time_limit, threads, symmetry_breaking, output,
+                           clique_cover, backend, run):
+    """solve_coloring through the solver-independent matrix model."""
+    num_colors = color_bound(coloring)
+    with run.phase("build"):
+        problem = coloring_problem(num_vertices, edges, num_colors, clique_cover, clique if symmetry_breaking else None)
+    with run.phase("solve"):
+        result = solve_problem(problem, backend, max(time_limit, 1), threads, output)
+    if result.x is not None:
+        coloring = result.x[:num_vertices * num_colors].reshape(num_vertices, num_colors).argmax(axis=1)
+    bound = len(clique) if result.bound is None else max(len(clique), math.ceil(result.bound - 1e-6))
+    return coloring, result.status == "optimal", bound
+
+
+def _solve_until(solve, deadline, num_vertices, edges, threads, **options):
+    """Run solve on one component with the time left until deadline, counted from when a pool worker starts it."""
+    return solve(num_vertices, edges, max(0.0, deadline - time.time()), threads, **options)
+
+
+def solve_reduced(num_vertices, edges, time_limit, threads=0, workers=1, symmetry_breaking=True, output=True,
+                  clique_cover=False, engine="assignment", backend="gurobi", run=None, start=None, lower_bound=0,
+                  lazy=False):
+    """Reduce the graph, solve its components and return (coloring, optimal, lower bound).
+
+    With workers > 1 the components are solved in a process pool and each one
+    gets threads // workers Gurobi threads; otherwise they run one after the
+    other. Either way they share the overall time limit: a component that
+    waits for a worker or for the ones before it only gets the time left.
+    engine picks how the components are solved: "assignment"
+    (solve_coloring), "colgen" (column generation, see
+    column_generation.py), the local searches "tabucol" and "partialcol"
+    (see tabucol.py), which only prove optimality when they reach the clique
+    bound, or "portfolio", the assignment MIP raced against tabucol. backend
+    only applies to the assignment and portfolio engines, and so does lazy
+    (conflict rows generated on demand, see solve_coloring). run is an instrumentation.RunLog; the components'
+    phases and models are only recorded in it when they are solved in this
+    process. start (a coloring of the whole graph) and lower_bound carry
+    over what an earlier, time limited solve found; start seeds the MIP of
+    every component.
+    """
+    deadline = time.time() + time_limit
+    run = run or RunLog()
+    with run.phase("reduce"):
+        lower_bound = max(lower_bound, len(greedy_clique(num_vertices, edges)))
+        kept, removed = reduce_graph(num_vertices, edges, lower_bound)
+        parts = components(num_vertices, edges, kept)
+        part_edges = [induced_edges(edges, part, num_vertices) for part in parts]
+
+    if engine == "colgen":
+        solve, options = solve_colgen, [{} for _ in parts]
+    elif engine in ("tabucol", "partialcol"):
+        solve, options = local_search_coloring, [{"method": engine} for _ in parts]
+    else:
+        solve = solve_coloring
+        options = [{"symmetry_breaking": symmetry_breaking, "clique_cover": clique_cover, "backend": backend,
+                    "start": None if start is None else np.unique(np.asarray(start)[part], return_inverse=True)[1],
+                    "race": engine == "portfolio", "lazy": lazy}
+                   for part in parts]
+
+    if workers > 1 and len(parts) > 1:
+        workers = min(workers, len(parts))
+        with run.phase("solve"), ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_solve_until, solve, deadline, len(part), e, max(1, threads // workers), output=False, **o)
+                       for part, e, o in zip(parts, part_edges, options)]
+            results = [future.result() for future in futures]
+    elif engine not in ("assignment", "portfolio"):
+        with run.phase("solve"):
+            results = [solve(len(part), e, deadline - time.time(), threads, output=output, **o)
+                       for part, e, o in zip(parts, part_edges, options)]
+    else:
+        results = [solve(len(part), e, deadline - time.time(), threads, output=output, run=run, **o)
+                   for part, e, o in zip(parts, part_edges, options)]
+
+    coloring = [-1] * num_vertices
+    optimal = True
+    for part, (part_coloring, part_optimal, part_bound) in zip(parts, results):
+        for v, c in zip(part.tolist(), part_coloring.tolist()):
+            coloring[v] = c
+        optimal = optimal and part_optimal
+        lower_bound = max(lower_bound, part_bound)
+    with run.phase("extract"):
+        coloring = extend_coloring(coloring, num_vertices, edges, removed)
+    optimal = optimal or len(set(coloring)) == lower_bound
+    return coloring, optimal, lower_bound
+
+
+def vertex_color_dict(coloring, vertices, colors):
+    """Group the vertices by color, as in the scripts' "Vertex Color" output."""
+    vertex_color = {}
+    for v, c in zip(vertices, coloring):
+        if c < 0:
+            continue  # uncolored
+        if colors[c] not in vertex_color:
+            vertex_color[colors[c]] = []
+        vertex_color[colors[c]].append(v)
+    return vertex_color
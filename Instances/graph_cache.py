@@ -0,0 +1,260 @@
+"""Cache of optimal colorings, shared by all copies of the same (relabelled) instance.
+
+Instance lists repeat graphs: relabelled copies, and the same graph with the
+same color lists in another file. The cache is keyed by a canonical hash of
+the parsed instance, not of the file:
+
+    labels   Weisfeiler-Lehman refinement. Every vertex starts from a hash
+             of its color list; each round mixes in the multiset of its
+             neighbours' labels, until the number of classes stops growing.
+             The labels only depend on the graph, not on the vertex numbers.
+    key      hash of the vertex and edge counts and the sorted labels.
+
+Equal keys do not prove isomorphism, so a lookup searches for an isomorphism
+between the new instance and each stored one with the same key: a
+backtracking search that maps vertices only within equal label classes and
+gives up after a step budget. The mapping is then checked exactly (every edge
+onto an edge, every color list equal) before the stored coloring is carried
+over through it.
+
+Entries live in an SQLite database in WAL mode, so the batch workers share
+it. It is bounded in bytes and evicts the least recently used entries.
+"""
+
+import hashlib
+import io
+import sqlite3
+import time
+from collections import deque
+
+import numpy as np
+from coloring_model import edge_array
+
+CACHE_PATH = ".result_cache.db"
+MAX_BYTES = 512 * 2 ** 20
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL,
+    payload BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_key ON entries (key);
+"""
+
+_M1 = np.uint64(0xbf58476d1ce4e5b9)
+_M2 = np.uint64(0x94d049bb133111eb)
+
+
+def _mix(h):
+    """splitmix64 finalizer, elementwise on a uint64 array."""
+    h = h ^ (h >> np.uint64(30))
+    h = h * _M1
+    h = h ^ (h >> np.uint64(27))
+    h = h * _M2
+    return h ^ (h >> np.uint64(31))
+
+
+def _list_hashes(instance):
+    """Initial label of every vertex: a hash of its color list, 0 without one."""
+    labels = np.zeros(instance.num_vertices, dtype=np.uint64)
+    ptr, colors = instance.list_ptr, instance.list_colors
+    for v in np.flatnonzero(instance.listed).tolist():
+        digest = hashlib.blake2b(np.sort(colors[ptr[v]:ptr[v + 1]]).astype(np.int64).tobytes(), digest_size=8)
+        labels[v] = int.from_bytes(digest.digest(), "little") | 1
+    return labels
+
+
+def wl_labels(instance, edges=None):
+    """Weisfeiler-Lehman labels of the vertices, as uint64 hashes."""
+    e = edge_array(instance.edges) if edges is None else edges
+    ends = np.concatenate([e[:, 0], e[:, 1]])
+    others = np.concatenate([e[:, 1], e[:, 0]])
+    labels = _list_hashes(instance)
+    num_classes = len(np.unique(labels))
+    with np.errstate(over="ignore"):
+        for _ in range(instance.num_vertices):
+            # the sum of mixed neighbour labels is a hash of their multiset
+            neighbours = np.zeros(instance.num_vertices, dtype=np.uint64)
+            np.add.at(neighbours, ends, _mix(labels[others] + np.uint64(1)))
+            refined = _mix(labels ^ _mix(neighbours + np.uint64(2)))
+            refined_classes = len(np.unique(refined))
+            labels = refined
+            if refined_classes == num_classes:
+                break
+            num_classes = refined_classes
+    return labels
+
+
+def canonical_key(instance, labels, edges):
+    """Hash of the instance that is the same for every relabelling of it."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(np.array([instance.num_vertices, len(edges), instance.vertex_offset], dtype=np.int64).tobytes())
+    digest.update(np.sort(labels).tobytes())
+    return digest.hexdigest()
+
+
+def _adjacency(num_vertices, edges):
+    adj = [set() for _ in range(num_vertices)]
+    for u, v in edges.tolist():
+        adj[u].add(v)
+        adj[v].add(u)
+    return adj
+
+
+def _search_order(adj, labels, class_size):
+    """Breadth-first order over every component, each started at a vertex of its smallest label class."""
+    n = len(adj)
+    seen = np.zeros(n, dtype=bool)
+    order = []
+    for s in sorted(range(n), key=lambda v: class_size[labels[v]]):
+        if seen[s]:
+            continue
+        seen[s] = True
+        queue = deque([s])
+        while queue:
+            v = queue.popleft()
+            order.append(v)
+            for u in sorted(adj[v], key=lambda t: class_size[labels[t]]):
+                if not seen[u]:
+                    seen[u] = True
+                    queue.append(u)
+    return order
+
+
+def find_isomorphism(adj_a, adj_b, labels_a, labels_b, budget=200000):
+    """Map the vertices of graph a onto those of graph b, label classes onto label classes.
+
+    Returns the mapping as a list, or None if there is none or the search ran
+    out of its step budget. Every edge of a is mapped onto an edge of b; with
+    equal edge counts that makes the mapping an isomorphism.
+    """
+    n = len(adj_a)
+    members = {}
+    for w, label in enumerate(labels_b):
+        members.setdefault(label, []).append(w)
+    class_size = {label: len(ws) for label, ws in members.items()}
+    if any(label not in class_size for label in labels_a):
+        return None
+    order = _search_order(adj_a, labels_a, class_size)
+
+    phi = [-1] * n
+    used = [False] * n
+    pending = [None] * n
+    steps = 0
+    i = 0
+    while i < n:
+        if i < 0:
+            return None
+        v = order[i]
+        if pending[i] is None:
+            pending[i] = iter(members[labels_a[v]])
+        elif phi[v] >= 0:
+            used[phi[v]] = False
+            phi[v] = -1
+        for w in pending[i]:
+            steps += 1
+            if steps > budget:
+                return None
+            if not used[w] and all(phi[u] < 0 or phi[u] in adj_b[w] for u in adj_a[v]):
+                phi[v] = w
+                used[w] = True
+                break
+        if phi[v] >= 0:
+            i += 1
+        else:
+            pending[i] = None
+            i -= 1
+    return phi
+
+
+def _color_lists(list_ptr, list_colors, listed):
+    """Sorted color list of every vertex, None for vertices without one."""
+    return [tuple(sorted(list_colors[list_ptr[v]:list_ptr[v + 1]].tolist())) if listed[v] else None
+            for v in range(len(listed))]
+
+
+def _pack(arrays):
+    buffer = io.BytesIO()
+    np.savez(buffer, **arrays)
+    return buffer.getvalue()
+
+
+def _unpack(payload):
+    with np.load(io.BytesIO(payload)) as data:
+        return {name: data[name] for name in data.files}
+
+
+class GraphCache:
+    """Optimal colorings by canonical instance hash, in an SQLite database at path."""
+
+    def __init__(self, path=CACHE_PATH, max_bytes=MAX_BYTES, timeout=60):
+        self.max_bytes = max_bytes
+        self.db = sqlite3.connect(path, timeout=timeout, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(_SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _canonical(self, instance):
+        edges = edge_array(instance.edges)
+        labels = wl_labels(instance, edges)
+        return canonical_key(instance, labels, edges), labels, edges
+
+    def lookup(self, instance):
+        """A stored optimal coloring, remapped onto instance, or None."""
+        key, labels, edges = self._canonical(instance)
+        rows = self.db.execute("SELECT id, payload FROM entries WHERE key = ? ORDER BY last_used DESC", (key,)).fetchall()
+        if not rows:
+            return None
+        adj = _adjacency(instance.num_vertices, edges)
+        lists = _color_lists(instance.list_ptr, instance.list_colors, instance.listed)
+        for entry_id, payload in rows:
+            stored = _unpack(payload)
+            if len(stored["edges"]) != len(edges):
+                continue
+            stored_adj = _adjacency(instance.num_vertices, stored["edges"])
+            phi = find_isomorphism(adj, stored_adj, labels.tolist(), stored["labels"].tolist())
+            if phi is None:
+                continue
+            # exact check of the mapping before trusting it
+            stored_lists = _color_lists(stored["list_ptr"], stored["list_colors"], stored["listed"])
+            if any(lists[v] != stored_lists[w] for v, w in enumerate(phi)):
+                continue
+            if any(phi[v] not in stored_adj[phi[u]] for u, v in edges.tolist()):
+                continue
+            self.db.execute("UPDATE entries SET last_used = ? WHERE id = ?", (time.time(), entry_id))
+            return stored["coloring"][np.asarray(phi, dtype=np.int64)]
+        return None
+
+    def store(self, instance, coloring):
+        """Add an optimal coloring of instance, then evict down to max_bytes."""
+        key, labels, edges = self._canonical(instance)
+        payload = _pack({"edges": edges.astype(np.int32), "labels": labels, "list_ptr": np.asarray(instance.list_ptr),
+                         "list_colors": np.asarray(instance.list_colors), "listed": np.asarray(instance.listed),
+                         "coloring": np.asarray(coloring, dtype=np.int64)})
+        if len(payload) > self.max_bytes:
+            return
+        self.db.execute("INSERT INTO entries (key, payload, size, last_used) VALUES (?, ?, ?, ?)",
+                        (key, payload, len(payload), time.time()))
+        self.evict()
+
+    def evict(self):
+        """Drop the least recently used entries until the cache fits in max_bytes."""
+        total = 0
+        drop = []
+        for entry_id, size in self.db.execute("SELECT id, size FROM entries ORDER BY last_used DESC").fetchall():
+            total += size
+            if total > self.max_bytes:
+                drop.append((entry_id,))
+        if drop:
+            self.db.executemany("DELETE FROM entries WHERE id = ?", drop)
@@ -0,0 +1,142 @@
+"""Greedy coloring heuristics run before the MIP is built.
+
+Their coloring gives an upper bound on the number of colors, so the color set
+of the model can be cut down to it, and it is passed to Gurobi as a MIP start.
+Colorings are returned as an int array with the 0-based color index of every
+vertex.
+"""
+
+import heapq
+
+import numpy as np
+from coloring_model import edge_array
+
+
+def adjacency_lists(num_vertices, edges):
+    """Neighbour list of every vertex."""
+    adj = [[] for _ in range(num_vertices)]
+    for u, v in edge_array(edges).tolist():
+        adj[u].append(v)
+        adj[v].append(u)
+    return adj
+
+
+def dsatur(num_vertices, edges, list_coloring=None, num_colors=None):
+    """DSATUR coloring: always color the vertex with the most distinct neighbour colors.
+
+    With list_coloring every listed vertex only takes colors from its list, and
+    the other vertices colors below num_colors. Returns None if some vertex runs
+    out of allowed colors.
+    """
+    adj = adjacency_lists(num_vertices, edges)
+    color = [-1] * num_vertices
+    seen = [set() for _ in range(num_vertices)]
+    heap = [(0, -len(adj[v]), v) for v in range(num_vertices)]
+    heapq.heapify(heap)
+
+    while heap:
+        sat, _, v = heapq.heappop(heap)
+        if color[v] >= 0 or -sat != len(seen[v]):
+            continue  # already colored, or a stale entry
+
+        if list_coloring is not None and v in list_coloring:
+            c = next((c for c in list_coloring[v] if c not in seen[v]), -1)
+        else:
+            c = 0
+            while c in seen[v]:
+                c += 1
+            if num_colors is not None and c >= num_colors:
+                c = -1
+        if c < 0:
+            return None
+        color[v] = c
+
+        for u in adj[v]:
+            if color[u] < 0 and c not in seen[u]:
+                seen[u].add(c)
+                heapq.heappush(heap, (-len(seen[u]), -len(adj[u]), u))
+
+    return np.array(color, dtype=np.int64)
+
+
+def rlf(num_vertices, edges):
+    """Recursive Largest First coloring, one maximal color class at a time.
+
+    Each class starts from the uncolored vertex with the most uncolored
+    neighbours and then keeps adding the candidate that has the most neighbours
+    already excluded from the class.
+    """
+    adj = [set(a) for a in adjacency_lists(num_vertices, edges)]
+    color = np.full(num_vertices, -1, dtype=np.int64)
+    uncolored = set(range(num_vertices))
+    k = 0
+
+    while uncolored:
+        candidates = set(uncolored)
+        excluded = set()
+        v = max(candidates, key=lambda u: len(adj[u] & candidates))
+        while True:
+            color[v] = k
+            uncolored.discard(v)
+            candidates.discard(v)
+            blocked = adj[v] & candidates
+            candidates -= blocked
+            excluded |= blocked
+            if not candidates:
+                break
+            v = max(candidates, key=lambda u: (len(adj[u] & excluded), -len(adj[u] & candidates)))
+        k += 1
+
+    return color
+
+
+def greedy_coloring(num_vertices, edges, rlf_limit=2000):
+    """Best of DSATUR and, on graphs up to rlf_limit vertices, RLF."""
+    best = dsatur(num_vertices, edges)
+    if num_vertices <= rlf_limit:
+        other = rlf(num_vertices, edges)
+        if best is None or other.max(initial=-1) < best.max(initial=-1):
+            best = other
+    return best
+
+
+def color_bound(coloring):
+    """Number of colors the model needs to hold this coloring."""
+    return int(coloring.max(initial=-1)) + 1
+
+
+def greedy_clique(num_vertices, edges, starts=50):
+    """Large clique from a multi-start greedy search.
+
+    Each of the starts highest-degree vertices seeds a clique that is grown by
+    the candidate with the most neighbours among the remaining candidates. The
+    clique size is a lower bound on the number of colors.
+    """
+    adj = [set(a) for a in adjacency_lists(num_vertices, edges)]
+    seeds = sorted(range(num_vertices), key=lambda v: len(adj[v]), reverse=True)[:starts]
+    best = []
+    for s in seeds:
+        if len(adj[s]) < len(best):
+            continue  # cannot beat the best clique
+        clique = [s]
+        candidates = set(adj[s])
+        while candidates:
+            v = max(candidates, key=lambda u: len(adj[u] & candidates))
+            clique.append(v)
+            candidates &= adj[v]
+        if len(clique) > len(best):
+            best = clique
+    return best
+
+
+def relabel_colors(coloring, order):
+    """Renumber the colors by first appearance along the vertex order.
+
+    This puts a coloring in the canonical form that add_symmetry_breaking
+    allows, so it can still be used as a MIP start.
+    """
+    new = {}
+    for v in order:
+        if coloring[v] not in new:
+            new[coloring[v]] = len(new)
+    return np.array([new[c] for c in coloring], dtype=np.int64)
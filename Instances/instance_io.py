@@ -0,0 +1,140 @@
+"""Single-pass reader for the DIMACS (.col) and list coloring instance files.
+
+Two formats are read:
+
+    DIMACS          c ...            comments
+                    p edge V E       header, vertices are 1..V
+                    e u v            one line per edge
+
+    list coloring   n=V              header, vertices are 0..V-1
+                    e u v            one line per edge
+                    v: c1<tab>c2...  allowed colors of vertex v
+
+Each file is read once. Edges come back as a 0-based (m, 2) NumPy array, and
+the color lists as a CSR structure (list_ptr, list_colors) plus a mask of the
+vertices that have a list. load_instance caches the arrays as .npy files that
+are memory-mapped on the next run, so batch runs over the same instance list
+skip the text parsing.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from array import array
+from collections import namedtuple
+
+import numpy as np
+
+Instance = namedtuple("Instance", ["num_vertices", "edges", "list_ptr", "list_colors", "listed", "vertex_offset"])
+
+CACHE_DIR = ".instance_cache"
+_ARRAYS = ("edges", "list_ptr", "list_colors", "listed")
+
+
+def parse_instance(filename):
+    """Parse a DIMACS or list coloring file in one pass and return an Instance."""
+    num_vertices = None
+    list_format = False
+    ends = array('q')
+    list_vertex = array('q')
+    list_len = array('q')
+    list_colors = array('q')
+
+    with open(filename, 'r') as file:
+        for line in file:
+            head = line[:1]
+            if head == 'e':
+                words = line.split()
+                ends.append(int(words[1]))
+                ends.append(int(words[2]))
+            elif head == 'p':
+                num_vertices = int(line.split()[2])
+            elif head == 'n' and '=' in line:
+                num_vertices = int(line.split('=')[1])
+                list_format = True
+            elif head == 'c':
+                continue
+            elif ':' in line:
+                parts = line.split(':')
+                colors = parts[1].split()
+                list_vertex.append(int(parts[0]))
+                list_len.append(len(colors))
+                list_colors.extend(int(color) for color in colors)
+
+    vertex_offset = 0 if list_format else 1
+    edges = np.frombuffer(ends, dtype=np.int64).reshape(-1, 2) - vertex_offset
+    if num_vertices is None:
+        num_vertices = int(edges.max()) + 1 if len(edges) else 0
+
+    # CSR over all vertices; vertices without a list get an empty row
+    counts = np.zeros(num_vertices, dtype=np.int64)
+    listed = np.zeros(num_vertices, dtype=bool)
+    vs = np.frombuffer(list_vertex, dtype=np.int64)
+    lens = np.frombuffer(list_len, dtype=np.int64)
+    counts[vs] = lens
+    listed[vs] = True
+    list_ptr = np.zeros(num_vertices + 1, dtype=np.int64)
+    np.cumsum(counts, out=list_ptr[1:])
+    flat = np.frombuffer(list_colors, dtype=np.int64)
+    colors = np.empty(len(flat), dtype=np.int64)
+    if len(vs):
+        # lines may come in any order, so place each list at its vertex's row
+        src = np.repeat(np.cumsum(lens) - lens, lens) + _ramp(lens)
+        dst = np.repeat(list_ptr[vs], lens) + _ramp(lens)
+        colors[dst] = flat[src]
+
+    return Instance(num_vertices, edges.astype(np.int32), list_ptr, colors.astype(np.int32), listed, vertex_offset)
+
+
+def _ramp(lens):
+    """0, 1, ..., lens[0]-1, 0, 1, ..., lens[1]-1, ..."""
+    starts = np.cumsum(lens) - lens
+    return np.arange(lens.sum()) - np.repeat(starts, lens)
+
+
+def color_lists(instance):
+    """Return the color lists as the {vertex: [colors]} dict used by the scripts."""
+    ptr, colors = instance.list_ptr, instance.list_colors
+    return {int(v): colors[ptr[v]:ptr[v + 1]].tolist() for v in np.flatnonzero(instance.listed)}
+
+
+def cache_key(filename):
+    """Content hash of the file plus its modification time."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(filename, 'rb') as file:
+        for block in iter(lambda: file.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest() + "-" + str(os.stat(filename).st_mtime_ns)
+
+
+def load_instance(filename, cache_dir=CACHE_DIR):
+    """Return the Instance for filename, parsing it only on a cache miss.
+
+    Cached arrays are opened memory-mapped and read-only. Pass cache_dir=None
+    to always parse.
+    """
+    if cache_dir is None:
+        return parse_instance(filename)
+
+    entry = os.path.join(cache_dir, cache_key(filename))
+    if os.path.isdir(entry):
+        with open(os.path.join(entry, "meta.json")) as file:
+            meta = json.load(file)
+        arrays = [np.load(os.path.join(entry, name + ".npy"), mmap_mode='r') for name in _ARRAYS]
+        return Instance(meta["num_vertices"], *arrays, meta["vertex_offset"])
+
+    instance = parse_instance(filename)
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp = tempfile.mkdtemp(dir=cache_dir)
+    for name in _ARRAYS:
+        np.save(os.path.join(tmp, name + ".npy"), getattr(instance, name))
+    with open(os.path.join(tmp, "meta.json"), "w") as file:
+        json.dump({"num_vertices": instance.num_vertices, "vertex_offset": instance.vertex_offset}, file)
+    try:
+        os.rename(tmp, entry)
+    except OSError:
+        # another process cached the same file first
+        shutil.rmtree(tmp, ignore_errors=True)
+    return instance
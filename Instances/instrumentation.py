@@ -0,0 +1,126 @@
+"""Per-instance timing, memory and solver progress, as one JSONL record per run.
+
+    run = RunLog(filename)
+    with run.phase("parse"):
+        instance = load_instance(filename)
+    ...
+    run.optimize(vc)            # instead of vc.optimize()
+    ...
+    run.write("runs.jsonl")
+
+A record holds the seconds spent in every phase (parse, heuristics, build,
+presolve, solve, extract, ...), the peak resident memory of the process, and
+for every optimized model its size (variables, rows, nonzeros) and a time
+series of incumbent and bound collected by a MIP callback.
+"""
+
+import json
+import time
+from contextlib import contextmanager
+
+from gurobipy import GRB
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB, None where it cannot be read.
+
+    In a process pool this is the high-water mark of the worker over all the
+    instances it has solved so far.
+    """
+    if resource is None:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _value(v):
+    """Objective value from a callback, None for Gurobi's infinity."""
+    return None if abs(v) >= GRB.INFINITY else v
+
+
+class RunLog:
+    """Timing and solver progress of one instance."""
+
+    def __init__(self, filename=None):
+        self.record = {"file": filename, "phases": {}, "models": []}
+
+    @contextmanager
+    def phase(self, name):
+        """Time the enclosed block and add it to phase name."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
+    def add_time(self, name, seconds):
+        phases = self.record["phases"]
+        phases[name] = phases.get(name, 0.0) + seconds
+
+    def optimize(self, vc, *callbacks):
+        """vc.optimize() with the progress callback; the given callbacks are called as well, in order.
+
+        Records the model size and a [runtime, incumbent, bound] entry whenever
+        one of them changes, and splits the solve time into presolve (until
+        the first callback after presolve) and solve.
+        """
+        vc.update()
+        model = {"vars": vc.NumVars, "rows": vc.NumConstrs, "nonzeros": vc.NumNZs, "progress": []}
+        self.record["models"].append(model)
+        progress = model["progress"]
+        presolved = []
+
+        def progress_callback(m, where):
+            if where in (GRB.Callback.POLLING, GRB.Callback.PRESOLVE, GRB.Callback.MESSAGE):
+                pass
+            elif not presolved:
+                presolved.append(m.cbGet(GRB.Callback.RUNTIME))
+            if where == GRB.Callback.MIP:
+                point = [m.cbGet(GRB.Callback.RUNTIME), _value(m.cbGet(GRB.Callback.MIP_OBJBST)),
+                         _value(m.cbGet(GRB.Callback.MIP_OBJBND))]
+            elif where == GRB.Callback.MIPSOL:
+                point = [m.cbGet(GRB.Callback.RUNTIME), _value(m.cbGet(GRB.Callback.MIPSOL_OBJBST)),
+                         _value(m.cbGet(GRB.Callback.MIPSOL_OBJBND))]
+            else:
+                point = None
+            if point and (not progress or progress[-1][1:] != point[1:]):
+                progress.append(point)
+            for callback in callbacks:
+                callback(m, where)
+
+        vc.optimize(progress_callback)
+        if vc.IsMIP and vc.SolCount:
+            point = [vc.Runtime, vc.ObjVal, vc.ObjBound]
+            if not progress or progress[-1][1:] != point[1:]:
+                progress.append(point)
+        presolve = min(presolved[0], vc.Runtime) if presolved else vc.Runtime
+        self.add_time("presolve", presolve)
+        self.add_time("solve", vc.Runtime - presolve)
+        model["status"] = vc.status
+        if vc.SolCount:
+            model["objective"] = vc.ObjVal
+        if vc.IsMIP and vc.SolCount:
+            model["bound"] = vc.ObjBound
+
+    def finish(self):
+        """Add the peak memory so far and return the record.
+
+        Call it in the process that did the solve; the record can then be
+        passed to another process and written there.
+        """
+        self.record["peak_rss_mb"] = peak_rss_mb()
+        return self.record
+
+    def write(self, path):
+        """Append the finished record as one line to path."""
+        write_record(path, self.finish())
+
+
+def write_record(path, record):
+    """Append a record as one JSON line to path."""
+    with open(path, "a") as file:
+        file.write(json.dumps(record, default=float) + "\n")
@@ -1,83 +1,72 @@
 import gurobipy as gp
 from gurobipy import GRB
+from coloring_model import build_list_coloring_model, set_list_mip_start, add_symmetry_breaking, pair_coloring, used_colors
+from coloring_solver import vertex_color_dict
+from heuristics import dsatur, greedy_clique
+from instance_io import load_instance, color_lists
+from reporting import show, gap_percent
+from instrumentation import RunLog
+from precheck import INFEASIBLE, check_lists
 import time
 
 try:
     with open("combined list coloring files.txt", "r") as file:
         filenames = file.read().splitlines()
     for filename in filenames:
-        with open(filename, 'r') as file:
-            no_of_vertices = []
-            for line in file:
-                if line.startswith('n'):
-                    word = int(line.split('=')[1])
-                    no_of_vertices.append(word)
-        vertices = list(range(no_of_vertices[0]))
-        colors = list(range(1, no_of_vertices[0]))
-
-        with open(filename, 'r') as file:
-            edges = []
-            for line in file:
-                if line.startswith('e'):
-                    num = line.split()[1:]
-                    edge = tuple(map(int, num))
-                    edges.append(edge)
-
-        with open(filename, 'r') as file:
-            list_coloring = {}
-            for line in file:
-                if ":" in line:
-                    parts = line.split(":")
-                    vertex = int(parts[0].strip())
-                    colors_str = parts[1].strip().split("\t")
-                    colors_corr = [int(color) for color in colors_str]
-                    list_coloring[vertex] = colors_corr
-
-        print("vertices =", vertices)
-        print("colors =", colors)
-        print("edges =", edges)
-        print("list coloring= ", list_coloring)
+        run = RunLog(filename)
+        with run.phase("parse"):
+            instance = load_instance(filename)
+        vertices = list(range(instance.num_vertices))
+        colors = list(range(1, instance.num_vertices))
+        edges = instance.edges
+        list_coloring = color_lists(instance)
+
+        show("vertices", vertices)
+        show("colors", colors)
+        show("edges", edges)
+        show("list coloring", list_coloring)
+
+        # Precheck: propagate the color lists and reject instances that cannot be colored
+        with run.phase("precheck"):
+            list_coloring, infeasible = check_lists(len(vertices), edges, list_coloring)
+        if infeasible:
+            output_filename = f"{filename.split('.')[0]}_output.txt"
+            with open(output_filename, 'w') as output_file:
+                output_file.write(f"File Name: {filename} - {INFEASIBLE}: {infeasible}\n")
+            run.write("combined list coloring runs.jsonl")
+            continue
+
+        # Heuristics: list coloring as MIP start and clique lower bound
+        with run.phase("heuristics"):
+            coloring = dsatur(len(vertices), edges, list_coloring, len(colors))
+            clique = greedy_clique(len(vertices), edges)
 
         # Model
-        vc = gp.Model("VCP")
-
-        # Variables
-        x = []
-        for v in vertices:
-            x.append([vc.addVar(vtype=GRB.BINARY, name="X" + str(v) + " " + str(c)) for c in colors])
-        y = []
-        for c in colors:
-            y.append(vc.addVar(vtype=GRB.BINARY, name="Y" + str(c)))
-
-        #Constraints
-        #C1
-        for v in list_coloring.keys():
-            valid_colors = list_coloring.get(v)
-            vc.addConstr(gp.quicksum(x[v][c] for c in valid_colors) == 1)
-
-        #C2
-        for v1 in range(len(vertices)):
-            for v2 in range(len(vertices)):
-                if (v1, v2) in edges:
-                    for c in range(len(colors)):
-                        vc.addConstr(x[v1][c] + x[v2][c] <= y[c])
-
-        #Objective
-        vc.setObjective(gp.quicksum(y[c] for c in range(len(colors))), GRB.MINIMIZE)
+        with run.phase("build"):
+            vc, x, y, var_vertex, var_color = build_list_coloring_model(len(vertices), edges, len(colors), list_coloring)
+            add_symmetry_breaking(vc, x, y, clique, list_coloring)
+            if coloring is not None:
+                set_list_mip_start(x, y, coloring, var_vertex, var_color)
 
         #timelimit
         vc.setParam(GRB.Param.TimeLimit, 1800)  # 1800 seconds = 30 minutes
         start_time = time.time()
 
         #optimize
-        vc.optimize()
+        run.optimize(vc)
 
         end_time=time.time()
         time_taken = end_time - start_time
         print(f"time = {time_taken} ")
+        if vc.status == GRB.INFEASIBLE:
+            output_filename = f"{filename.split('.')[0]}_output.txt"
+            with open(output_filename, 'w') as output_file:
+                output_file.write(f"File Name: {filename} - {INFEASIBLE}: proven by the MIP\n")
+            run.write("combined list coloring runs.jsonl")
+            continue
         best_objective = vc.ObjVal
         best_bound = vc.ObjBound
-        gap_percentage = (best_bound - best_objective)
+        gap_percentage = gap_percent(best_objective, best_bound)
         print(f"gap = {gap_percentage}")
 
         # Check status
@@ -86,21 +75,13 @@ try:
             with open(output_filename, 'w') as output_file:
                 output_file.write(f"File Name: {filename} - \n")
 
-                colors_used = []
-                for c in range(len(colors)):
-                    if y[c].X == 1:
-                        colors_used.append(colors[c])
+                with run.phase("extract"):
+                    colors_used = [colors[c] for c in used_colors(y.X)]
+                    coloring = pair_coloring(x.X, var_vertex, var_color, len(vertices))
+                    vertex_color = vertex_color_dict(coloring, vertices, colors)
+
                 output_file.write(f"Colors used = {colors_used} - \n")
                 output_file.write(f"Total no of colors used = {len(colors_used)}\n")
-
-                vertex_color = {}
-                for v in range(len(vertices)):
-                    for c in range(len(colors)):
-                        if x[v][c].X == 1:
-                            if colors[c] not in vertex_color:
-                                vertex_color[colors[c]] = []
-                            vertex_color[colors[c]].append(vertices[v])
-
                 output_file.write(f"Vertex Color: {vertex_color} - \n")
                 output_file.write(f"Objective value: {vc.ObjVal}\n")
 
@@ -113,6 +94,8 @@ try:
             with open(output_filename, 'w') as output_file:
                 output_file.write(f"File Name: {filename} - No optimal solution for the problem\n")
 
+        run.write("combined list coloring runs.jsonl")
+
 except gp.GurobiError as e:
     print('Error code ' + str(e.errno) + ': ' + str(e))
 except AttributeError:
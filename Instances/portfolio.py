@@ -0,0 +1,105 @@
+"""Portfolio race: the local search and the MIP on the same graph at the same time.
+
+The MIP usually finds the optimum early and spends the rest of its time limit
+on the proof, while the local search finds good colorings fast but proves
+nothing. HeuristicRace runs tabucol (see tabucol.py) in a separate process,
+on its own core, next to the Gurobi solve:
+
+    every coloring the local search improves to is put on a queue, and the
+    MIP callback injects it into the model as a new incumbent
+    (cbSetSolution);
+    the callback stops the MIP as soon as the incumbent reaches the best
+    lower bound, the clique bound or the model's bound rounded up, instead
+    of letting it run out the time limit;
+    the local search process is stopped with the MIP.
+"""
+
+import math
+import multiprocessing
+import os
+import queue
+
+import numpy as np
+from gurobipy import GRB
+from heuristics import relabel_colors
+from tabucol import local_search_coloring
+
+
+def race_threads(threads):
+    """Gurobi threads when one core is left to the local search (threads 0 means all cores)."""
+    return max(1, (threads or os.cpu_count() or 2) - 1)
+
+
+def _search(num_vertices, edges, time_limit, method, found):
+    local_search_coloring(num_vertices, edges, time_limit, output=False, method=method,
+                          report=lambda coloring: found.put(coloring.tolist()))
+
+
+class HeuristicRace:
+    """A local search process feeding its colorings to the Gurobi model with variables x, y.
+
+    order is the vertex order returned by add_symmetry_breaking, if the model
+    has it; the colorings are renumbered to the canonical form it allows.
+    lower_bound is the clique bound.
+    """
+
+    def __init__(self, num_vertices, edges, x, y, time_limit, lower_bound, order=None, method="tabucol"):
+        self.x, self.y = x, y
+        self.order = order
+        self.lower_bound = lower_bound
+        self.best = None
+        self.injected = 0
+        self.found = multiprocessing.Queue()
+        self.process = multiprocessing.Process(target=_search, args=(num_vertices, edges, time_limit, method, self.found))
+        self.process.start()
+
+    def close(self):
+        if self.process.is_alive():
+            self.process.terminate()
+        self.process.join()
+        self.found.close()
+        self.found.cancel_join_thread()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _receive(self):
+        """Take the best coloring the local search has sent so far; True if it improved."""
+        improved = False
+        while True:
+            try:
+                coloring = self.found.get_nowait()
+            except queue.Empty:
+                return improved
+            if self.best is None or max(coloring) < max(self.best):
+                self.best = coloring
+                improved = True
+
+    def callback(self, m, where):
+        """MIP callback: inject new local search colorings and stop once the incumbent is proven optimal."""
+        if where == GRB.Callback.MIP:
+            incumbent, bound = m.cbGet(GRB.Callback.MIP_OBJBST), m.cbGet(GRB.Callback.MIP_OBJBND)
+        elif where == GRB.Callback.MIPNODE:
+            incumbent, bound = m.cbGet(GRB.Callback.MIPNODE_OBJBST), m.cbGet(GRB.Callback.MIPNODE_OBJBND)
+        else:
+            return
+        if self._receive() and max(self.best) + 1 < incumbent - 0.5:
+            coloring = self.best if self.order is None else relabel_colors(self.best, self.order)
+            num_vertices, num_colors = self.x.shape
+            start = np.zeros((num_vertices, num_colors))
+            start[np.arange(num_vertices), coloring] = 1
+            m.cbSetSolution(self.x, start)
+            m.cbSetSolution(self.y, start.max(axis=0))
+            if where == GRB.Callback.MIPNODE:
+                m.cbUseSolution()
+            self.injected += 1
+        proven = max(self.lower_bound, math.ceil(bound - 1e-6))
+        if incumbent < GRB.INFINITY and incumbent < proven + 0.5:
+            m.terminate()
+
+    def summary(self):
+        """What the local search contributed, for the run record."""
+        return {"injected": self.injected, "heuristic_colors": None if self.best is None else max(self.best) + 1}
@@ -0,0 +1,93 @@
+"""Infeasibility precheck for list coloring instances, run before the model is built.
+
+Only the vertices with a color list take part: the others get no assignment
+row in the model and stay uncolored.
+
+    unit propagation  a vertex left with a single allowed color must take it,
+                      so that color is removed from the lists of its
+                      neighbours, until no list shrinks any more. A list that
+                      runs empty proves the instance infeasible.
+    Hall check        the vertices of a clique need pairwise different colors,
+                      so there must be a matching of the clique into its
+                      colors that covers every vertex (Hall's condition).
+                      Cliques are grown greedily from the vertices with the
+                      shortest lists, and each is checked with a maximum
+                      bipartite matching.
+
+check_lists returns the propagated lists, which the model is then built
+from, and a reason when the instance is infeasible. Passing the check does
+not prove feasibility.
+"""
+
+from collections import deque
+
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.csgraph import maximum_bipartite_matching
+from heuristics import adjacency_lists
+
+INFEASIBLE = "Infeasible"
+
+
+def propagate_lists(adj, lists):
+    """Unit propagation over the color lists (sets, changed in place). Returns a reason if one runs empty."""
+    queue = deque(v for v, colors in lists.items() if len(colors) == 1)
+    while queue:
+        v = queue.popleft()
+        if not lists[v]:
+            return f"vertex {v} has no color left"
+        c = next(iter(lists[v]))
+        for u in adj[v]:
+            if u in lists and c in lists[u]:
+                lists[u].discard(c)
+                if len(lists[u]) <= 1:
+                    queue.append(u)
+    empty = [v for v, colors in lists.items() if not colors]
+    return f"vertex {empty[0]} has no color left" if empty else None
+
+
+def listed_cliques(adj, lists, starts=100):
+    """Greedy cliques among the listed vertices, one from each of the starts vertices with the shortest lists."""
+    seeds = sorted(lists, key=lambda v: (len(lists[v]), -len(adj[v])))[:starts]
+    cliques = []
+    for s in seeds:
+        clique = [s]
+        candidates = {u for u in adj[s] if u in lists}
+        while candidates:
+            v = max(candidates, key=lambda u: len(adj[u] & candidates))
+            clique.append(v)
+            candidates &= adj[v]
+        if len(clique) > 1:
+            cliques.append(clique)
+    return cliques
+
+
+def hall_violation(clique, lists):
+    """True if the clique cannot get pairwise different colors from its lists."""
+    colors = sorted(set().union(*(lists[v] for v in clique)))
+    if len(colors) < len(clique):
+        return True
+    index = {c: i for i, c in enumerate(colors)}
+    rows = np.repeat(np.arange(len(clique)), [len(lists[v]) for v in clique])
+    cols = [index[c] for v in clique for c in lists[v]]
+    graph = sp.csr_matrix((np.ones(len(cols)), (rows, cols)), shape=(len(clique), len(colors)))
+    matching = maximum_bipartite_matching(graph, perm_type="column")
+    return np.count_nonzero(matching >= 0) < len(clique)
+
+
+def check_lists(num_vertices, edges, list_coloring, starts=100):
+    """Propagate the color lists and look for a Hall violation.
+
+    Returns (list_coloring, reason): the propagated lists as a
+    {vertex: [colors]} dict, and None, or a string saying why the instance
+    is infeasible.
+    """
+    adj = [set(a) for a in adjacency_lists(num_vertices, edges)]
+    lists = {v: set(colors) for v, colors in list_coloring.items()}
+    reason = propagate_lists(adj, lists)
+    if reason is None:
+        for clique in listed_cliques(adj, lists, starts):
+            if hall_violation(clique, lists):
+                reason = f"the {len(clique)} vertices of a clique at vertex {clique[0]} cannot get different colors"
+                break
+    return {v: sorted(colors) for v, colors in lists.items()}, reason
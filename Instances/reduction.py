@@ -0,0 +1,108 @@
+"""Graph reduction for the plain coloring problem.
+
+Given a lower bound k on the number of colors, two kinds of vertices can be
+removed before the MIP is built and colored again afterwards:
+
+    low degree   deg(v) < k, so one of the first k colors is always free for v
+    dominated    u and v not adjacent and N(u) within N(v), so u can copy v's color
+
+Removal is repeated until nothing changes. The remaining graph is then split
+into connected components that can be colored independently.
+"""
+
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.csgraph import connected_components
+from coloring_model import edge_array
+
+
+def reduce_graph(num_vertices, edges, lower_bound):
+    """Remove low degree and dominated vertices.
+
+    Returns (kept, removed): a boolean mask of the remaining vertices and the
+    removed ones in removal order, as (vertex, dominator) pairs with dominator
+    -1 for low degree vertices.
+    """
+    adj = [set() for _ in range(num_vertices)]
+    for u, v in edge_array(edges).tolist():
+        adj[u].add(v)
+        adj[v].add(u)
+    kept = np.ones(num_vertices, dtype=bool)
+    removed = []
+
+    def remove(v, dominator):
+        kept[v] = False
+        removed.append((v, dominator))
+        for u in adj[v]:
+            adj[u].discard(v)
+
+    changed = True
+    while changed:
+        changed = False
+
+        stack = [v for v in range(num_vertices) if kept[v] and len(adj[v]) < lower_bound]
+        while stack:
+            v = stack.pop()
+            if not kept[v]:
+                continue
+            neighbours = list(adj[v])
+            remove(v, -1)
+            changed = True
+            stack.extend(u for u in neighbours if kept[u] and len(adj[u]) < lower_bound)
+
+        for u in range(num_vertices):
+            if not kept[u] or not adj[u]:
+                continue
+            # a dominator is adjacent to every neighbour of u, in particular to the
+            # one with the fewest neighbours
+            w = min(adj[u], key=lambda t: len(adj[t]))
+            for v in adj[w]:
+                if v != u and v not in adj[u] and len(adj[v]) >= len(adj[u]) and adj[u] <= adj[v]:
+                    remove(u, v)
+                    changed = True
+                    break
+
+    return kept, removed
+
+
+def extend_coloring(coloring, num_vertices, edges, removed):
+    """Color the removed vertices again, in reverse removal order.
+
+    coloring holds a color for every kept vertex and -1 for removed ones; it is
+    updated in place and returned.
+    """
+    adj = [[] for _ in range(num_vertices)]
+    for u, v in edge_array(edges).tolist():
+        adj[u].append(v)
+        adj[v].append(u)
+    for v, dominator in reversed(removed):
+        if dominator >= 0:
+            coloring[v] = coloring[dominator]
+        else:
+            taken = {coloring[u] for u in adj[v]}
+            c = 0
+            while c in taken:
+                c += 1
+            coloring[v] = c
+    return coloring
+
+
+def components(num_vertices, edges, kept):
+    """Connected components of the kept vertices, as arrays of vertex ids."""
+    e = edge_array(edges)
+    e = e[kept[e[:, 0]] & kept[e[:, 1]]]
+    graph = sp.coo_matrix((np.ones(len(e)), (e[:, 0], e[:, 1])), shape=(num_vertices, num_vertices))
+    _, labels = connected_components(graph, directed=False)
+    labels = labels[kept]
+    ids = np.flatnonzero(kept)
+    order = np.argsort(labels, kind="stable")
+    splits = np.flatnonzero(np.diff(labels[order])) + 1
+    return np.split(ids[order], splits) if len(ids) else []
+
+
+def induced_edges(edges, vertices, num_vertices):
+    """Edges among vertices, renumbered to 0..len(vertices)-1."""
+    local = np.full(num_vertices, -1, dtype=np.int64)
+    local[vertices] = np.arange(len(vertices))
+    e = local[edge_array(edges)]
+    return e[(e[:, 0] >= 0) & (e[:, 1] >= 0)]
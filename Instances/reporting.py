@@ -0,0 +1,48 @@
+"""Console output of the coloring scripts.
+
+Instance-sized data (vertex, color and edge lists, color lists, colorings and
+variable values) is only printed in full when COLORING_VERBOSE=1 is set in the
+environment. Otherwise show prints just its size, so large instances do not
+spend minutes writing to the terminal. Output files are written in full either
+way.
+"""
+
+import math
+import os
+
+VERBOSE = os.environ.get("COLORING_VERBOSE", "0") not in ("", "0")
+
+
+def show(label, value):
+    """Print label = value in verbose mode, and only len(value) otherwise."""
+    if VERBOSE:
+        print(label, "=", value)
+    else:
+        print(f"{label}: {len(value)} entries")
+
+
+def dump_solution(vc):
+    """Print every variable and its value (verbose mode only), then the objective.
+
+    Names and values are read with one getAttr call each instead of one
+    attribute call per variable.
+    """
+    if VERBOSE:
+        variables = vc.getVars()
+        names = vc.getAttr("VarName", variables)
+        values = vc.getAttr("X", variables)
+        print("\n".join('%s %g' % (n, v) for n, v in zip(names, values)))
+    print('Obj: %g' % vc.ObjVal)
+
+
+def gap_percent(objective, bound):
+    """Relative MIP gap in percent, as Gurobi defines it: |bound - objective| / |objective|.
+
+    0 when objective and bound agree (also when both are 0), inf when only
+    the objective is 0.
+    """
+    if objective == bound:
+        return 0.0
+    if objective == 0:
+        return math.inf
+    return 100 * abs(bound - objective) / abs(objective)
@@ -0,0 +1,106 @@
+"""Crash-safe results store for the batch runs, in SQLite.
+
+One row per instance file with its status, its CSV row and its
+instrumentation record. The database runs in WAL mode, so every worker
+process can open its own connection and write its result the moment it has
+one, while the others keep reading and writing. A rerun after a crash or
+preemption skips the files that already finished; the CSV files are exported
+from the store.
+
+status is one of
+    running      a worker has started on it (left over if the run died)
+    pending      not optimal after a tier that is not the last one
+    optimal      solved to optimality
+    not_optimal  out of time
+    infeasible   the precheck or the MIP proved it infeasible
+    error        the solve raised an exception
+"""
+
+import csv
+import json
+import sqlite3
+import time
+
+FINISHED = ("optimal", "not_optimal", "infeasible")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    file TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    row TEXT,
+    record TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    updated REAL NOT NULL
+)
+"""
+
+
+def _csv_value(value):
+    """The value as the CSV writer would print it, so the export matches the old files."""
+    if isinstance(value, (str, int, float)) or value is None:
+        return value
+    return str(value)
+
+
+class ResultStore:
+    """Per-instance results in an SQLite database at path."""
+
+    def __init__(self, path, timeout=60):
+        self.path = path
+        self.db = sqlite3.connect(path, timeout=timeout, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute(_SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def status(self, filename):
+        """Status of filename, None if it was never started."""
+        row = self.db.execute("SELECT status FROM results WHERE file = ?", (filename,)).fetchone()
+        return row and row[0]
+
+    def finished(self):
+        """The files that need no further solve."""
+        marks = ", ".join("?" * len(FINISHED))
+        rows = self.db.execute(f"SELECT file FROM results WHERE status IN ({marks})", FINISHED)
+        return {file for file, in rows}
+
+    def start(self, filename):
+        """Mark filename as running and count the attempt."""
+        self.db.execute("INSERT INTO results (file, status, attempts, updated) VALUES (?, 'running', 1, ?) "
+                        "ON CONFLICT(file) DO UPDATE SET status = 'running', attempts = attempts + 1, updated = excluded.updated",
+                        (filename, time.time()))
+
+    def save(self, filename, status, row, record=None):
+        """Store the result of filename: its status, CSV row and instrumentation record."""
+        row = {key: _csv_value(value) for key, value in row.items()}
+        self.db.execute("INSERT INTO results (file, status, row, record, updated) VALUES (?, ?, ?, ?, ?) "
+                        "ON CONFLICT(file) DO UPDATE SET status = excluded.status, row = excluded.row, "
+                        "record = excluded.record, updated = excluded.updated",
+                        (filename, status, json.dumps(row), json.dumps(record, default=float), time.time()))
+
+    def rows(self, statuses=FINISHED):
+        """The stored CSV rows with one of the given statuses, in the order they were stored."""
+        marks = ", ".join("?" * len(statuses))
+        query = f"SELECT row FROM results WHERE status IN ({marks}) AND row IS NOT NULL ORDER BY updated"
+        return [json.loads(row) for row, in self.db.execute(query, tuple(statuses))]
+
+    def export_csv(self, csv_path, fieldnames, status_fieldnames, statuses=FINISHED + ("error",)):
+        """Write the stored rows to csv_path, in the layout the batch scripts append.
+
+        As in those files, the header is written once, for the first row, and
+        rows without a solution use the (File Name, Status) columns.
+        """
+        with open(csv_path, "w", newline="") as csv_file:
+            for i, row in enumerate(self.rows(statuses)):
+                writer = csv.DictWriter(csv_file, fieldnames=status_fieldnames if "Status" in row else fieldnames)
+                if i == 0:
+                    writer.writeheader()
+                writer.writerow(row)
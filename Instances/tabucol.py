@@ -0,0 +1,180 @@
+"""Local search colorings for graphs too large for the MIP.
+
+Two tabu searches for a coloring with k colors, both on a CSR adjacency
+(indptr, indices) and a conflict-count matrix gamma, where gamma[v, c] is the
+number of neighbours of v with color c. A move only touches the rows of the
+moved vertex's neighbours, so gamma is updated in O(deg) per move instead of
+being recounted.
+
+    tabucol     every vertex has a color; minimize the number of conflicting
+                edges. Moving v from color a to b changes it by
+                gamma[v, b] - gamma[v, a].
+    partialcol  the coloring is always proper but may leave vertices
+                uncolored; minimize their number. Coloring v with c uncolors
+                its gamma[v, c] neighbours of color c.
+
+local_search_coloring drives them with k-decrement: starting from the greedy
+coloring, it drops the smallest color class and searches for a k - 1
+coloring, until the search fails, the clique bound is reached or time runs
+out.
+"""
+
+import time
+
+import numpy as np
+from coloring_model import edge_array
+from heuristics import greedy_coloring, greedy_clique, color_bound
+
+BIG = np.iinfo(np.int64).max // 4
+
+
+def csr_adjacency(num_vertices, edges):
+    """Neighbour arrays of all vertices: the neighbours of v are indices[indptr[v]:indptr[v + 1]]."""
+    e = edge_array(edges)
+    ends = np.concatenate([e[:, 0], e[:, 1]])
+    others = np.concatenate([e[:, 1], e[:, 0]])
+    order = np.argsort(ends, kind="stable")
+    indptr = np.zeros(num_vertices + 1, dtype=np.int64)
+    np.cumsum(np.bincount(ends, minlength=num_vertices), out=indptr[1:])
+    return indptr, others[order]
+
+
+def conflict_counts(indptr, indices, coloring, k):
+    """gamma[v, c]: the number of neighbours of v with color c (uncolored neighbours, -1, are not counted)."""
+    n = len(indptr) - 1
+    gamma = np.zeros((n, k), dtype=np.int64)
+    owner = np.repeat(np.arange(n), np.diff(indptr))
+    colored = coloring[indices] >= 0
+    np.add.at(gamma, (owner[colored], coloring[indices][colored]), 1)
+    return gamma
+
+
+def tabucol(indptr, indices, coloring, k, max_iters, rng, deadline=None):
+    """Tabu search for a proper k coloring from coloring (colors 0..k-1).
+
+    Returns (best coloring, its number of conflicting edges); 0 conflicts
+    means it is proper.
+    """
+    n = len(coloring)
+    col = np.array(coloring, dtype=np.int64)
+    gamma = conflict_counts(indptr, indices, col, k)
+    rows = np.arange(n)
+    f = int(gamma[rows, col].sum()) // 2
+    best, best_f = col.copy(), f
+    tabu = np.zeros((n, k), dtype=np.int64)
+
+    it = 0
+    while f > 0 and it < max_iters:
+        if deadline is not None and it % 256 == 0 and time.time() > deadline:
+            break
+        it += 1
+        conflicted = np.flatnonzero(gamma[rows, col] > 0)
+        g = gamma[conflicted]
+        own = col[conflicted]
+        delta = g - g[np.arange(len(conflicted)), own][:, None]
+        delta[np.arange(len(conflicted)), own] = BIG
+        # tabu moves are allowed only if they beat the best coloring so far
+        delta = np.where((tabu[conflicted] <= it) | (f + delta < best_f), delta, BIG)
+        m = delta.min()
+        if m >= BIG:
+            continue
+        i, c = np.argwhere(delta == m)[rng.integers(np.count_nonzero(delta == m))]
+        v = conflicted[i]
+        old = col[v]
+        nb = indices[indptr[v]:indptr[v + 1]]
+        gamma[nb, old] -= 1
+        gamma[nb, c] += 1
+        col[v] = c
+        f += int(m)
+        tabu[v, old] = it + int(0.6 * len(conflicted)) + int(rng.integers(10))
+        if f < best_f:
+            best, best_f = col.copy(), f
+    return best, best_f
+
+
+def partialcol(indptr, indices, coloring, k, max_iters, rng, deadline=None):
+    """Tabu search over proper partial k colorings from coloring (-1 for uncolored).
+
+    Returns (best coloring, its number of uncolored vertices); 0 means it is
+    a complete k coloring.
+    """
+    n = len(coloring)
+    col = np.array(coloring, dtype=np.int64)
+    gamma = conflict_counts(indptr, indices, col, k)
+    best, best_f = col.copy(), int(np.count_nonzero(col < 0))
+    tabu = np.zeros((n, k), dtype=np.int64)
+
+    it = 0
+    while best_f > 0 and it < max_iters:
+        if deadline is not None and it % 256 == 0 and time.time() > deadline:
+            break
+        it += 1
+        uncolored = np.flatnonzero(col < 0)
+        f = len(uncolored)
+        # coloring v with c uncolors gamma[v, c] neighbours
+        delta = gamma[uncolored] - 1
+        delta = np.where((tabu[uncolored] <= it) | (f + delta < best_f), delta, BIG)
+        m = delta.min()
+        if m >= BIG:
+            continue
+        i, c = np.argwhere(delta == m)[rng.integers(np.count_nonzero(delta == m))]
+        v = uncolored[i]
+        nb = indices[indptr[v]:indptr[v + 1]]
+        tenure = int(0.6 * f) + int(rng.integers(10))
+        for u in nb[col[nb] == c].tolist():
+            col[u] = -1
+            gamma[indices[indptr[u]:indptr[u + 1]], c] -= 1
+            tabu[u, c] = it + tenure
+        col[v] = c
+        gamma[nb, c] += 1
+        if f + m < best_f:
+            best, best_f = col.copy(), f + int(m)
+    return best, best_f
+
+
+def _drop_smallest_class(coloring, rng, partial):
+    """Renumber the colors to 0..k-1 and remove the smallest class.
+
+    Its vertices become uncolored (partial) or get a random remaining color.
+    """
+    _, col, sizes = np.unique(coloring, return_inverse=True, return_counts=True)
+    k = len(sizes)
+    last = int(np.argmin(sizes))
+    col = np.where(col == last, k - 1, np.where(col == k - 1, last, col))
+    moved = col == k - 1
+    col[moved] = -1 if partial else rng.integers(k - 1, size=np.count_nonzero(moved))
+    return col
+
+
+def local_search_coloring(num_vertices, edges, time_limit, threads=0, output=True, method="tabucol", max_iters=None,
+                          seed=0, report=None):
+    """Color a graph by k-decrement local search. Returns (coloring, optimal, lower bound).
+
+    The result is optimal only when it reaches the greedy clique bound.
+    max_iters is the iteration budget of each k (default 100 per vertex,
+    at least 10000); threads is unused and only there to match the other
+    engines. report, if given, is called with every improved coloring
+    (colors 0..k-1) as soon as it is found.
+    """
+    deadline = time.time() + time_limit
+    rng = np.random.default_rng(seed)
+    lower_bound = len(greedy_clique(num_vertices, edges))
+    best = greedy_coloring(num_vertices, edges)
+    if num_vertices == 0 or color_bound(best) <= lower_bound:
+        return best, True, lower_bound
+
+    indptr, indices = csr_adjacency(num_vertices, edges)
+    search = partialcol if method == "partialcol" else tabucol
+    max_iters = max_iters or max(10000, 100 * num_vertices)
+    k = len(np.unique(best))
+    while k > lower_bound and time.time() < deadline:
+        start = _drop_smallest_class(best, rng, method == "partialcol")
+        coloring, f = search(indptr, indices, start, k - 1, max_iters, rng, deadline)
+        if f > 0:
+            break
+        best, k = coloring, k - 1
+        if report is not None:
+            report(np.unique(best, return_inverse=True)[1])
+        if output:
+            print(f"{method}: {k} colors")
+    return np.unique(best, return_inverse=True)[1], k == lower_bound, lower_bound
@@ -0,0 +1,96 @@
+"""Tiered time limits: carry each instance's incumbent and bound over to the next tier.
+
+    python batch_runner.py "combined list coloring files.txt" "Result.csv" --tiers 1800 3600
+
+solves every instance for 1800 s, then gives only the ones that are not
+optimal yet another 1800 s (3600 s in total), warm-started from where the
+first tier stopped instead of from scratch. Tier limits are cumulative.
+"30 list coloring.py" and "60 list coloring.py" are the two tiers of the same
+escalation and share their state the same way.
+
+batch_runner keeps the state next to its results store (<store>.tiers), so
+it belongs to one batch; the two scripts share STATE_DIR. For every
+instance, the state directory holds <name>.json with the tier reached, the
+seconds spent so far, the best bound, whether the instance is solved, and
+the incumbent coloring. For a Gurobi model it also holds the
+model's <name>.sol and <name>.mst; the model is rebuilt identically in the
+next tier and the .mst is read back as its MIP start.
+"""
+
+import json
+import math
+import os
+import re
+
+STATE_DIR = "tier_state"
+
+
+def state_base(state_dir, filename):
+    """Path of the instance's state files, without extension."""
+    return os.path.join(state_dir, re.sub(r"[^\w.-]", "_", filename))
+
+
+def load_state(base):
+    """The saved state of an instance, or None before its first tier."""
+    try:
+        with open(base + ".json") as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return None
+
+
+def save_state(base, state, vc=None):
+    """Save the state dict and, if vc has a solution, its .sol and .mst files."""
+    os.makedirs(os.path.dirname(base) or ".", exist_ok=True)
+    if vc is not None and vc.SolCount:
+        vc.write(base + ".sol")
+        vc.write(base + ".mst")
+    tmp = base + ".json.tmp"
+    with open(tmp, "w") as file:
+        json.dump(state, file)
+    os.replace(tmp, base + ".json")
+
+
+def model_state(vc, tier, seconds, coloring=None):
+    """State of a solved Gurobi model: its bound, rounded up, and optimality.
+
+    A model proven infeasible counts as optimal too: no later tier can do better.
+    """
+    from gurobipy import GRB
+
+    bound = math.ceil(vc.ObjBound - 1e-6) if vc.SolCount or vc.status == GRB.OPTIMAL else 0
+    return {"tier": tier, "time": seconds, "bound": bound, "optimal": vc.status in (GRB.OPTIMAL, GRB.INFEASIBLE),
+            "coloring": None if coloring is None else [int(c) for c in coloring]}
+
+
+def read_start(vc, path):
+    """Set the Start of vc's variables from an .mst file, by position.
+
+    The models are built without variable names, so Gurobi's own vc.read
+    would not find them; the file lists the variables in model order.
+    """
+    with open(path) as file:
+        values = [float(line.split()[-1]) for line in file if line.strip() and not line.startswith("#")]
+    variables = vc.getVars()
+    if len(values) == len(variables):
+        vc.setAttr("Start", variables, values)
+
+
+def warm_start(vc, y, base, state):
+    """Read the previous tier's MIP start into vc and add its bound as sum_c y[c] >= bound."""
+    if os.path.exists(base + ".mst"):
+        vc.update()
+        read_start(vc, base + ".mst")
+    if state["bound"] > 0:
+        vc.addConstr(y.sum() >= state["bound"])
+
+
+def remaining(filenames, state_dir, time_limit):
+    """The files that still need a solve for a cumulative time_limit, with the time each one has left."""
+    todo = []
+    for filename in filenames:
+        state = load_state(state_base(state_dir, filename))
+        spent = 0.0 if state is None else state["time"]
+        if state is None or (not state["optimal"] and spent < time_limit):
+            todo.append((filename, time_limit - spent))
+    return todo
@@ -0,0 +1,218 @@
+"""Assignment problem engine for Assignment_Problem.ipynb: many small problems, large sparse ones, and repairs.
+
+    solve_assignment_batch   a stacked (B, n, m) cost array, solved with
+                             scipy's linear_sum_assignment across a process
+                             pool, one chunk of problems per task.
+    solve_assignment_sparse  a scipy sparse cost matrix whose stored entries
+                             are the allowed pairs, solved with
+                             min_weight_full_bipartite_matching, so a large n
+                             with few allowed pairs never gets a dense matrix.
+    IncrementalAssignment    keeps the optimal assignment and its dual
+                             potentials; when a few rows of costs change,
+                             only those rows are unassigned and reassigned
+                             by shortest augmenting paths (the Hungarian
+                             method's augmentation step), O(k n^2) for k
+                             rows instead of a full re-solve. The path
+                             searches are scipy's Dijkstra over the edges
+                             of small reduced cost only.
+
+Assignments are returned as in linear_sum_assignment: the column of every
+row.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import scipy.sparse as sp
+from scipy.optimize import linear_sum_assignment
+from scipy.sparse.csgraph import dijkstra, min_weight_full_bipartite_matching
+
+CANDIDATES = 20
+
+
+def dict_cost_matrix(costs):
+    """Cost matrix of a {worker: {job: cost}} dict. Returns (workers, jobs, matrix)."""
+    workers = list(costs)
+    jobs = list(costs[workers[0]])
+    flat = np.fromiter((costs[w][j] for w in workers for j in jobs), dtype=float, count=len(workers) * len(jobs))
+    return workers, jobs, flat.reshape(len(workers), len(jobs))
+
+
+def _solve_chunk(costs):
+    cols = np.empty(costs.shape[:2], dtype=np.int64)
+    for b, cost in enumerate(costs):
+        cols[b] = linear_sum_assignment(cost)[1]
+    return cols
+
+
+def solve_assignment_batch(costs, workers=None, chunks_per_worker=4):
+    """Solve every problem of a (B, n, m) cost array, n <= m. Returns (columns (B, n), total costs (B,)).
+
+    The problems are split into chunks_per_worker chunks per worker and the
+    chunks are solved in a process pool of workers processes (default: all
+    cores); with workers=1 they are solved in this process.
+    """
+    costs = np.asarray(costs)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(costs) < 2 * workers:
+        cols = _solve_chunk(costs)
+    else:
+        chunks = np.array_split(costs, workers * chunks_per_worker)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            cols = np.concatenate(list(pool.map(_solve_chunk, chunks)))
+    totals = np.take_along_axis(costs, cols[:, :, None], axis=2)[:, :, 0].sum(axis=1)
+    return cols, totals
+
+
+def solve_assignment_sparse(costs):
+    """Solve an assignment over the allowed pairs only. Returns (row_ind, col_ind).
+
+    costs is a scipy sparse (n, m) matrix, n <= m, whose stored entries are
+    the allowed pairs; zero and negative costs are allowed. Raises ValueError
+    if the rows cannot all be assigned.
+    """
+    costs = sp.csr_matrix(costs)
+    if costs.nnz == 0:
+        raise ValueError("no allowed pairs")
+    # the matching drops explicit zeros; a constant shift does not change the optimum of a full matching
+    shifted = costs.copy()
+    shifted.data = shifted.data - shifted.data.min() + 1
+    return min_weight_full_bipartite_matching(shifted)
+
+
+class IncrementalAssignment:
+    """An optimal assignment for an (n, m) cost matrix, n <= m, that can be repaired after cost changes.
+
+    Rectangular problems are padded with zero-cost rows. The dual potentials
+    u, v (reduced costs c[i,j] - u[i] - v[j] >= 0, zero on the assignment)
+    are recovered once from linear_sum_assignment's solution and kept up to
+    date by the repairs, together with the matrix of reduced costs, so a
+    repair only touches the columns its path search scanned. Construction
+    costs about one linear_sum_assignment plus O(m^2) NumPy passes.
+    """
+
+    def __init__(self, costs):
+        costs = np.asarray(costs, dtype=float)
+        self.n, m = costs.shape
+        if self.n > m:
+            raise ValueError("more rows than columns")
+        self.costs = np.zeros((m, m))
+        self.costs[:self.n] = costs
+        self.row_col = linear_sum_assignment(self.costs)[1]
+        self.col_row = np.empty(m, dtype=np.int64)
+        self.col_row[self.row_col] = np.arange(m)
+        self.u, self.v = self._potentials()
+        self.reduced = self.costs - self.u[:, None] - self.v
+
+    def _potentials(self):
+        """Dual potentials for the current assignment.
+
+        Any v with v[j] <= v[row_col[i]] + c[i,j] - c[i,row_col[i]] for all
+        i, j will do: shortest distances over those column-to-column edges.
+        They are computed by Bellman-Ford over the CANDIDATES cheapest edges
+        out of every column only, relaxing all of them at once per pass
+        until nothing changes; the edges the result violates are then added
+        and it is run again, which is rarely needed. Every edge gets a
+        tolerance, so float rounding cannot make a zero cycle negative.
+        Optimality rules out negative cycles otherwise.
+        """
+        m = len(self.costs)
+        cols = np.arange(m)
+        weights = self.costs[self.col_row] - self.costs[self.col_row, cols][:, None]
+        tol = 1e-12 * (1 + np.abs(self.costs).max())
+        edges = np.zeros((m, m), dtype=bool)
+        k = min(CANDIDATES, m)
+        edges[cols[:, None], np.argpartition(weights, k - 1, axis=1)[:, :k]] = True
+        v = np.zeros(m)
+        while True:
+            # edges grouped by head, for one minimum per column and pass
+            b, a = np.nonzero(edges.T)
+            w = weights[a, b] + tol
+            starts = np.flatnonzero(np.diff(b, prepend=-1))
+            heads = b[starts]
+            for _ in range(m + 1):
+                relaxed = v.copy()
+                relaxed[heads] = np.minimum(v[heads], np.minimum.reduceat(v[a] + w, starts))
+                if np.array_equal(relaxed, v):
+                    break
+                v = relaxed
+            violated = v[None, :] > v[:, None] + weights + 2 * tol
+            if not violated.any():
+                break
+            edges |= violated
+        u = self.costs[cols, self.row_col] - v[self.row_col]
+        return u, v
+
+    @property
+    def col_ind(self):
+        """Column of every (non-padding) row."""
+        return self.row_col[:self.n].copy()
+
+    @property
+    def total(self):
+        return self.costs[np.arange(self.n), self.row_col[:self.n]].sum()
+
+    def update(self, rows, costs):
+        """Set the costs of the given rows (a (len(rows), m) array) and repair the assignment."""
+        rows = np.atleast_1d(np.asarray(rows, dtype=np.int64))
+        self.costs[rows] = costs
+        cols = self.row_col[rows]
+        self.col_row[cols] = -1
+        self.row_col[rows] = -1
+        # the changed rows' potentials are lowered until their reduced costs are >= 0 again
+        self.u[rows] = (self.costs[rows] - self.v).min(axis=1)
+        self.reduced[rows] = self.costs[rows] - self.u[rows, None] - self.v
+        for i in rows.tolist():
+            self._augment(i)
+        return self.col_ind
+
+    def _augment(self, i):
+        """Assign row i by a shortest augmenting path in reduced costs, updating the potentials.
+
+        The path search is scipy's Dijkstra over the columns: from an
+        assigned column to every column at its row's reduced costs, and
+        from row i (node m) to every column. Only the edges up to a length
+        limit go into the graph, and Dijkstra stops there; the limit starts
+        at row i's CANDIDATES-th smallest reduced cost and is doubled until
+        a free column is reached, which the direct edge from row i to its
+        cheapest free column guarantees.
+        """
+        m = len(self.costs)
+        free = np.flatnonzero(self.col_row < 0)
+        row_node = self.row_col.copy()
+        row_node[i] = m
+        bound = max(self.reduced[i, free].min(), 0)
+        k = min(CANDIDATES, m - 1)
+        limit = min(max(np.partition(self.reduced[i], k)[k], 0), bound)
+        while True:
+            r, b = np.nonzero(self.reduced <= limit)
+            nodes = row_node[r]
+            keep = nodes >= 0
+            graph = sp.csr_matrix((np.maximum(self.reduced[r[keep], b[keep]], 0), (nodes[keep], b[keep])),
+                                  shape=(m + 1, m + 1))
+            dist, pred = dijkstra(graph, indices=m, return_predecessors=True, limit=limit)
+            if np.isfinite(dist[free]).any() or limit >= bound:
+                break
+            limit = min(2 * limit, bound) if limit > 0 else bound
+        j = int(free[np.argmin(dist[free])])
+        # the columns scanned before j (all assigned) move by the distance they were short of it, which
+        # keeps their rows' reduced costs zero and every other one >= 0
+        delta = np.maximum(dist[j] - dist[:m], 0)
+        scanned = np.flatnonzero(delta)
+        scanned_rows = self.col_row[scanned]
+        self.v[scanned] -= delta[scanned]
+        self.u[scanned_rows] += delta[scanned]
+        self.u[i] += dist[j]
+        self.reduced[:, scanned] += delta[scanned]
+        self.reduced[scanned_rows] -= delta[scanned][:, None]
+        self.reduced[i] -= dist[j]
+        # flip the assignment along the path back to row i
+        while True:
+            previous = int(pred[j])
+            r = i if previous == m else int(self.col_row[previous])
+            self.col_row[j] = r
+            self.row_col[r] = j
+            if previous == m:
+                break
+            j = previous
@@ -0,0 +1,296 @@
+"""0-1 knapsack engine for Knapsack_Problem.ipynb, on the notebook's items = [(name, weight, value)] format.
+
+The notebook's DP fills an (n + 1) x (capacity + 1) table of Python lists.
+Here a single row best[w] (best value within capacity w) is rolled over the
+items, and each item updates it with one vectorized np.maximum over the row
+shifted by the item's weight:
+
+    best[w:] = max(best[w:], best[:capacity + 1 - weight] + value)
+
+That is O(n * capacity) time in NumPy and O(capacity) memory for the value.
+The selected items are recovered in one of two ways:
+
+    bits         one packed bit per item and capacity, set where the item
+                 improved the row; backtracked like the notebook's table.
+                 n * capacity / 8 bytes.
+    hirschberg   divide and conquer: the best rows of the two halves of the
+                 items are combined to find how the capacity is split
+                 between them, and each half is solved again on its share.
+                 O(capacity) memory, about twice the time.
+
+solve_knapsack_dp uses the bits when they fit in max_bits bytes, otherwise
+the recursion. solve_knapsack_batch solves many instances at once, with one
+row per instance in a 2-D array.
+
+No DP can handle weights and capacities around 10^9. solve_knapsack_bb
+sorts the items by value / weight, solves a core problem around the break
+item (the first one the greedy fill does not fit) by depth-first branch and
+bound with the Martello-Toth bound, and fixes the items before the core to 1
+and those after it to 0. The fixing is then checked with the Dantzig bound:
+if flipping any fixed item cannot beat the core solution, it is optimal,
+otherwise the core is doubled and searched again from the solution so far.
+The search stops after max_nodes nodes in total, with the best solution
+found and optimal False. solve_knapsack picks the DP or the branch and
+bound from n * capacity.
+"""
+
+import bisect
+import math
+
+import numpy as np
+
+MAX_BITS = 64 * 2 ** 20
+DP_CELLS = 2 * 10 ** 8
+CORE = 25
+MAX_NODES = 2 * 10 ** 6
+
+
+def _arrays(items):
+    weights = np.array([w for _, w, _ in items])
+    values = np.array([v for _, _, v in items])
+    return weights, values
+
+
+def _update(best, weight, value):
+    """Add one item to the row in place; returns where it improved it (for capacities weight and up)."""
+    candidate = best[:len(best) - weight] + value
+    improved = candidate > best[weight:]
+    np.maximum(best[weight:], candidate, out=best[weight:])
+    return improved
+
+
+def dp_row(weights, values, capacity):
+    """Best total value of the items within every capacity 0..capacity."""
+    best = np.zeros(capacity + 1, dtype=np.result_type(values, np.int64))
+    for weight, value in zip(weights.tolist(), values.tolist()):
+        if weight <= capacity:
+            _update(best, weight, value)
+    return best
+
+
+def _select_bits(weights, values, capacity):
+    """Indices of an optimal selection, from the packed bit matrix of improvements."""
+    best = np.zeros(capacity + 1, dtype=np.result_type(values, np.int64))
+    bits = np.zeros((len(weights), (capacity + 8) // 8), dtype=np.uint8)
+    for i, (weight, value) in enumerate(zip(weights.tolist(), values.tolist())):
+        if weight <= capacity:
+            improved = np.zeros(capacity + 1, dtype=bool)
+            improved[weight:] = _update(best, weight, value)
+            bits[i] = np.packbits(improved)
+    selected = []
+    w = capacity
+    for i in range(len(weights) - 1, -1, -1):
+        if bits[i, w >> 3] >> (7 - (w & 7)) & 1:
+            selected.append(i)
+            w -= int(weights[i])
+    return selected[::-1]
+
+
+def _select_hirschberg(weights, values, capacity, offset=0):
+    """Indices of an optimal selection by divide and conquer over the items."""
+    n = len(weights)
+    if n == 0 or capacity < 0:
+        return []
+    if n == 1:
+        return [offset] if weights[0] <= capacity and values[0] > 0 else []
+    half = n // 2
+    left = dp_row(weights[:half], values[:half], capacity)
+    right = dp_row(weights[half:], values[half:], capacity)
+    split = int(np.argmax(left + right[::-1]))
+    return (_select_hirschberg(weights[:half], values[:half], split, offset)
+            + _select_hirschberg(weights[half:], values[half:], capacity - split, offset + half))
+
+
+def solve_knapsack_dp(items, capacity, max_bits=MAX_BITS):
+    """Solve a 0-1 knapsack by the rolling DP. Returns (optimal value, selected items).
+
+    The selected items are in the order of items. The bit matrix is used for
+    the selection when it takes at most max_bits bytes, the divide and
+    conquer recursion otherwise.
+    """
+    weights, values = _arrays(items)
+    if len(items) * (capacity + 8) // 8 <= max_bits:
+        chosen = _select_bits(weights, values, capacity)
+    else:
+        chosen = _select_hirschberg(weights, values, capacity)
+    return values[chosen].sum().item() if chosen else 0, [items[i] for i in chosen]
+
+
+def solve_knapsack_batch(instances):
+    """Solve many small knapsacks at once; instances is a list of (items, capacity).
+
+    The rows of all instances are stacked into one array and the j-th item of
+    every instance is added in the same vectorized step (instances with fewer
+    items are padded with empty ones). Returns a list of (optimal value,
+    selected items), one per instance.
+    """
+    if not instances:
+        return []
+    num = len(instances)
+    n = max(len(items) for items, _ in instances)
+    capacities = np.array([capacity for _, capacity in instances], dtype=np.int64)
+    width = int(capacities.max()) + 1
+    weights = np.zeros((num, n), dtype=np.int64)
+    values = np.zeros((num, n), dtype=np.result_type(*[_arrays(items)[1] for items, _ in instances if items], np.int64))
+    for b, (items, _) in enumerate(instances):
+        if items:
+            weights[b, :len(items)], values[b, :len(items)] = _arrays(items)
+
+    rows = np.arange(num)[:, None]
+    w = np.arange(width)
+    best = np.zeros((num, width), dtype=values.dtype)
+    bits = np.zeros((n, num, (width + 7) // 8), dtype=np.uint8)
+    for j in range(n):
+        source = w - weights[:, j:j + 1]
+        candidate = np.where(source >= 0, best[rows, np.maximum(source, 0)] + values[:, j:j + 1], best)
+        improved = candidate > best
+        best = np.where(improved, candidate, best)
+        bits[j] = np.packbits(improved, axis=1)
+
+    results = []
+    for b, (items, capacity) in enumerate(instances):
+        selected = []
+        c = capacity
+        for j in range(len(items) - 1, -1, -1):
+            if bits[j, b, c >> 3] >> (7 - (c & 7)) & 1:
+                selected.append(j)
+                c -= int(weights[b, j])
+        results.append((best[b, capacity].item(), [items[j] for j in selected[::-1]]))
+    return results
+
+
+def _ratio_order(weights, values, capacity):
+    """Indices of the items that can be in a solution, by value / weight, best first."""
+    candidates = np.flatnonzero((weights <= capacity) & (values > 0))
+    ratio = values[candidates] / np.maximum(weights[candidates], 1e-300)
+    return candidates[np.argsort(-ratio, kind="stable")]
+
+
+def _branch_and_bound(w, v, capacity, integral, best=0, best_taken=(), max_nodes=MAX_NODES):
+    """Depth-first branch and bound over items sorted by ratio. Returns (value, taken indices, nodes, complete).
+
+    Items are taken greedily as long as they fit; a node is pruned when the
+    Martello-Toth bound of the items left cannot beat the best solution,
+    starting from the incumbent best (the indices best_taken). After
+    max_nodes nodes the search stops with the best solution found so far,
+    and complete is False.
+    """
+    n = len(w)
+    prefix_w = [0]
+    prefix_v = [0]
+    for weight, value in zip(w, v):
+        prefix_w.append(prefix_w[-1] + weight)
+        prefix_v.append(prefix_v[-1] + value)
+
+    def bound(j, c):
+        # items j..s-1 fit, s is the break item of the rest
+        s = bisect.bisect_right(prefix_w, prefix_w[j] + c, j) - 1
+        full = prefix_v[s] - prefix_v[j]
+        if s >= n:
+            return full
+        rest = c - (prefix_w[s] - prefix_w[j])
+        # Martello-Toth: the break item either stays out or goes in at the cost of item s - 1
+        without = full + (rest * v[s + 1] / w[s + 1] if s + 1 < n else 0)
+        with_break = full + v[s] - (w[s] - rest) * v[s - 1] / w[s - 1] if s > j else -math.inf
+        u = max(without, with_break)
+        return math.floor(u + 1e-9) if integral else u
+
+    taken = []
+    j, c, value = 0, capacity, 0
+    best_taken = list(best_taken)
+    nodes = 0
+    while True:
+        if nodes == max_nodes:
+            return best, best_taken, nodes, False
+        nodes += 1
+        if j < n and value + bound(j, c) > best:
+            if w[j] <= c:
+                taken.append(j)
+                c -= w[j]
+                value += v[j]
+            j += 1
+            continue
+        if value > best:
+            best, best_taken = value, list(taken)
+        if not taken:
+            return best, best_taken, nodes, True
+        t = taken.pop()
+        c += w[t]
+        value -= v[t]
+        j = t + 1
+
+
+def _flip_bounds(prefix_w, prefix_v, w, v, capacity, js, take, integral):
+    """Dantzig bound of the whole problem with each item in js forced in (take) or left out."""
+    n = len(w)
+    js = np.asarray(js, dtype=np.int64)
+    base = v[js] if take else np.zeros(len(js), dtype=v.dtype)
+    c = capacity - w[js] if take else np.full(len(js), capacity, dtype=w.dtype)
+    # greedy fill of the other items: drop j from the prefix if it would be in it
+    k = np.searchsorted(prefix_w, c, side="right") - 1
+    shifted = js <= k
+    k = np.where(shifted, np.searchsorted(prefix_w, c + w[js], side="right") - 1, k)
+    used = prefix_w[k] - np.where(shifted, w[js], 0)
+    full = prefix_v[k] - np.where(shifted, v[js], 0)
+    nxt = np.minimum(k, n - 1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        frac = np.where(k < n, (c - used) * v[nxt] / w[nxt], 0)
+    u = base + full + frac
+    u = np.floor(u + 1e-9) if integral else u
+    return np.where(c >= 0, u, -np.inf)
+
+
+def solve_knapsack_bb(items, capacity, core=CORE, max_nodes=MAX_NODES):
+    """Solve a 0-1 knapsack by core branch and bound. Returns (value, selected items, optimal).
+
+    Works for any capacity and weights, including non-integer ones. core is
+    the initial number of items on each side of the break item. The branch
+    and bound explores at most max_nodes nodes over all core sizes; when
+    they run out, the best solution found is returned with optimal False.
+    Strongly correlated instances (value = weight + constant) with large
+    weights can need that many.
+    """
+    weights, values = _arrays(items)
+    integral = np.issubdtype(values.dtype, np.integer)
+    order = _ratio_order(weights, values, capacity)
+    w, v = weights[order], values[order]
+    n = len(order)
+    prefix_w = np.concatenate([[0], np.cumsum(w)])
+    prefix_v = np.concatenate([[0], np.cumsum(v)])
+    b = int(np.searchsorted(prefix_w, capacity, side="right")) - 1
+    optimal = True
+    if b >= n:
+        chosen = order
+    else:
+        # the greedy solution is the first incumbent, and each core starts from the previous core's solution
+        positions, z = list(range(b)), prefix_v[b].item()
+        half = core
+        while True:
+            lo, hi = max(0, b - half), min(n, b + half + 1)
+            value, taken, nodes, optimal = _branch_and_bound(
+                w[lo:hi].tolist(), v[lo:hi].tolist(), capacity - prefix_w[lo].item(), integral,
+                z - prefix_v[lo].item(), [p - lo for p in positions if p >= lo], max_nodes)
+            max_nodes -= nodes
+            positions, z = list(range(lo)) + [lo + t for t in taken], prefix_v[lo].item() + value
+            if not optimal or (lo == 0 and hi == n):
+                break
+            # every item fixed outside the core must be unable to beat z when flipped
+            if (_flip_bounds(prefix_w, prefix_v, w, v, capacity, np.arange(lo), False, integral) <= z).all() and \
+                    (_flip_bounds(prefix_w, prefix_v, w, v, capacity, np.arange(hi, n), True, integral) <= z).all():
+                break
+            half *= 2
+        chosen = order[np.asarray(positions, dtype=np.int64)]
+    chosen = np.sort(chosen)
+    return values[chosen].sum().item() if len(chosen) else 0, [items[i] for i in chosen.tolist()], optimal
+
+
+def solve_knapsack(items, capacity, dp_cells=DP_CELLS, max_nodes=MAX_NODES):
+    """Solve a 0-1 knapsack with the DP when n * capacity is at most dp_cells, by branch and bound otherwise.
+
+    Returns (value, selected items, optimal); only the branch and bound can
+    run out of nodes (see solve_knapsack_bb).
+    """
+    integer_weights = all(float(w).is_integer() for _, w, _ in items) and float(capacity).is_integer()
+    if integer_weights and len(items) * (capacity + 1) <= dp_cells:
+        return solve_knapsack_dp(items, int(capacity)) + (True,)
+    return solve_knapsack_bb(items, capacity, max_nodes=max_nodes)
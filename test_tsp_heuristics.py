@@ -0,0 +1,25 @@
+"""Regression tests for tsp_heuristics.py: coincident cities."""
+
+import numpy as np
+
+from tsp_heuristics import neighbor_lists, solve_tsp_heuristic, tour_length
+
+
+def test_neighbor_lists_skip_self_with_coincident_cities():
+    points = np.array([[3, 4], [1, 4], [3, 4], [0, 0]])
+    neighbors = neighbor_lists(points, 2)
+    assert not (neighbors == np.arange(len(points))[:, None]).any()
+    assert neighbors[2, 0] == 0 and neighbors[0, 0] == 2
+
+
+def test_coincident_cities_give_a_tour():
+    points = np.round(np.array([[3, 4], [1, 4], [3, 4], [0, 0]]) * 5)
+    tour, length = solve_tsp_heuristic(points)
+    assert sorted(tour) == [0, 1, 2, 3]
+    assert np.isclose(length, tour_length(points, tour))
+
+    # many cities on a 4 x 4 grid of points
+    points = np.random.default_rng(0).integers(0, 4, (40, 2)).astype(float)
+    for construction in ("greedy", "nearest"):
+        tour, length = solve_tsp_heuristic(points, k=5, construction=construction)
+        assert sorted(tour) == list(range(40))
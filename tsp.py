@@ -0,0 +1,168 @@
+"""Exact symmetric TSP for Traveling_Salesman_Problem.ipynb, with lazy subtour elimination.
+
+The notebook's models only have the in- and out-degree constraints, so for
+more than a few cities they return several disjoint cycles, and every
+constraint scans the whole distances dict. Here
+
+    distance_matrix   all pairwise distances from the coordinates in one
+                      NumPy pass.
+    build_tsp_model   one binary x[e] per edge i < j, built through the
+                      matrix API: degree 2 at every city as one sparse
+                      incidence matrix, the edge lengths as the objective.
+    SubtourCuts       the subtour elimination constraints
+                      sum_{e in delta(S)} x[e] >= 2 are added only when
+                      needed: from MIPSOL, for every connected component S
+                      of an integer solution that is not a full tour, and
+                      optionally from MIPNODE, for the components of the
+                      support of the fractional node relaxation.
+
+solve_tsp puts them together and returns the tour as a list of city
+indices.
+"""
+
+import numpy as np
+import scipy.sparse as sp
+import gurobipy as gp
+from gurobipy import GRB
+from scipy.sparse.csgraph import connected_components
+
+
+def distance_matrix(coords):
+    """Euclidean distances between all cities; coords is an (n, 2) array or a {city: (x, y)} dict.
+
+    Returns (cities, matrix), cities being the dict keys or range(n).
+    """
+    if isinstance(coords, dict):
+        cities = list(coords)
+        points = np.array([coords[c] for c in cities], dtype=float)
+    else:
+        points = np.asarray(coords, dtype=float)
+        cities = list(range(len(points)))
+    diff = points[:, None, :] - points[None, :, :]
+    return cities, np.sqrt((diff ** 2).sum(axis=2))
+
+
+def build_tsp_model(dist, model_name="TSP"):
+    """Build the degree-constrained edge model. Returns (model, x, ends).
+
+    x has one binary per edge i < j, in np.triu_indices order; ends is the
+    (E, 2) array of their cities. Without SubtourCuts the model is only
+    the relaxation that allows subtours.
+    """
+    n = len(dist)
+    i, j = np.triu_indices(n, k=1)
+    num_edges = len(i)
+    m = gp.Model(model_name)
+
+    # Variables
+    x = m.addMVar(num_edges, vtype=GRB.BINARY)
+
+    # Constraints: every city has degree 2
+    A = sp.csr_matrix((np.ones(2 * num_edges), (np.concatenate([i, j]), np.tile(np.arange(num_edges), 2))),
+                      shape=(n, num_edges))
+    m.addMConstr(A, x, '=', np.full(n, 2.0))
+
+    # Objective
+    m.setObjective(dist[i, j] @ x, GRB.MINIMIZE)
+    return m, x, np.stack([i, j], axis=1)
+
+
+def _components(n, ends, chosen):
+    """Connected components of the graph on the chosen edges: (count, label per city)."""
+    e = ends[chosen]
+    graph = sp.csr_matrix((np.ones(len(e)), (e[:, 0], e[:, 1])), shape=(n, n))
+    return connected_components(graph, directed=False)
+
+
+class SubtourCuts:
+    """Callback adding the subtour elimination constraints of build_tsp_model lazily.
+
+    The model needs the LazyConstraints parameter. With fractional, the
+    components of the fractional relaxation at the nodes are cut as well
+    (as user cuts), which needs the PreCrush parameter.
+    """
+
+    def __init__(self, x, ends, n, fractional=False):
+        self.x = x
+        self.ends = ends
+        self.n = n
+        self.fractional = fractional
+        self.lazy = 0
+        self.cuts = 0
+
+    def _cut_rows(self, values, threshold):
+        """The cut sum_{e in delta(S)} x[e] >= 2 for every component S of the edges with value above threshold."""
+        count, label = _components(self.n, self.ends, values > threshold)
+        if count == 1:
+            return []
+        first, second = label[self.ends[:, 0]], label[self.ends[:, 1]]
+        rows = []
+        for s in range(count):
+            cut = (first == s) != (second == s)
+            if values[cut].sum() < 2 - 1e-6:
+                rows.append(self.x[np.flatnonzero(cut)].sum() >= 2)
+        return rows
+
+    def callback(self, m, where):
+        if where == GRB.Callback.MIPSOL:
+            for row in self._cut_rows(m.cbGetSolution(self.x), 0.5):
+                m.cbLazy(row)
+                self.lazy += 1
+        elif self.fractional and where == GRB.Callback.MIPNODE and \
+                m.cbGet(GRB.Callback.MIPNODE_STATUS) == GRB.OPTIMAL:
+            for row in self._cut_rows(m.cbGetNodeRel(self.x), 1e-6):
+                m.cbCut(row)
+                self.cuts += 1
+
+
+def tour_from_edges(n, ends, chosen):
+    """City order of the tour formed by the chosen edges, starting at city 0."""
+    adj = [[] for _ in range(n)]
+    for u, v in ends[chosen].tolist():
+        adj[u].append(v)
+        adj[v].append(u)
+    tour = [0]
+    previous = -1
+    while len(tour) < n:
+        current = tour[-1]
+        following = adj[current][0] if adj[current][0] != previous else adj[current][1]
+        previous = current
+        tour.append(following)
+    return tour
+
+
+def set_tour_start(x, n, tour):
+    """Pass a tour (list of city indices) to the model as a MIP start."""
+    start = np.zeros(n * (n - 1) // 2)
+    u = np.asarray(tour)
+    v = np.roll(u, -1)
+    a, b = np.minimum(u, v), np.maximum(u, v)
+    # index of edge (a, b), a < b, in np.triu_indices order
+    start[a * n - a * (a + 1) // 2 + (b - a - 1)] = 1
+    x.Start = start
+
+
+def solve_tsp(dist, time_limit=None, fractional=False, output=True, start=None):
+    """Solve the TSP on a distance matrix. Returns (tour, length, optimal).
+
+    start is an optional tour (list of city indices) to use as the MIP start.
+    """
+    n = len(dist)
+    if n <= 3:
+        tour = list(range(n))
+        return tour, float(sum(dist[tour[k - 1], tour[k]] for k in range(n))) if n > 1 else 0.0, True
+    m, x, ends = build_tsp_model(dist)
+    m.setParam(GRB.Param.OutputFlag, int(output))
+    m.setParam(GRB.Param.LazyConstraints, 1)
+    if fractional:
+        m.setParam(GRB.Param.PreCrush, 1)
+    if time_limit is not None:
+        m.setParam(GRB.Param.TimeLimit, time_limit)
+    if start is not None:
+        set_tour_start(x, n, start)
+    cuts = SubtourCuts(x, ends, n, fractional)
+    m.optimize(cuts.callback)
+    if not m.SolCount:
+        return None, None, False
+    tour = tour_from_edges(n, ends, x.X > 0.5)
+    return tour, m.ObjVal, m.status == GRB.OPTIMAL
@@ -0,0 +1,268 @@
+"""Fast TSP tours for instances beyond the exact model (tsp.py), and MIP starts for it.
+
+    construction   nearest neighbour, or greedy edge: the shortest candidate
+                   edges are accepted as long as no city gets degree 3 and
+                   no cycle closes early, and the fragments are then joined
+                   end to end.
+    improvement    2-opt and Or-opt (moving a run of 1 to 3 cities
+                   elsewhere, in either orientation), both only trying the
+                   k nearest neighbours of a city as new partners. The
+                   neighbour lists come from a KD-tree over the coordinates.
+                   Don't-look bits: only the cities next to a change are
+                   looked at again, so a pass tries O(n k) moves instead
+                   of O(n^2). Applying a move only rewrites the shorter
+                   of the two tour paths it changes (2-opt reversals and
+                   Or-opt shifts alike).
+
+Tours are lists of city indices, in the order of the coords array;
+solve_tsp_heuristic returns one with its length, and tsp.solve_tsp(dist,
+start=tour) uses it as a MIP start.
+"""
+
+import math
+from collections import deque
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+EPS = 1e-9
+
+
+def neighbor_lists(points, k=10):
+    """The k nearest other cities of every city, nearest first, from a KD-tree."""
+    n = len(points)
+    k = min(k, n - 1)
+    if k <= 0:
+        return np.zeros((n, 0), dtype=np.int64)
+    _, idx = cKDTree(points).query(points, k=k + 1)
+    # with coincident cities the city itself need not come first, or at all
+    other = idx != np.arange(n)[:, None]
+    keep = np.argsort(~other, axis=1, kind="stable")[:, :k]
+    return np.take_along_axis(idx, keep, axis=1)
+
+
+def tour_length(points, tour):
+    p = points[np.asarray(tour)]
+    return float(np.sqrt(((p - np.roll(p, -1, axis=0)) ** 2).sum(axis=1)).sum())
+
+
+def nearest_neighbor_tour(points, neighbors, start=0):
+    """Always go to the nearest unvisited city; the neighbour lists are tried before a full scan."""
+    n = len(points)
+    visited = np.zeros(n, dtype=bool)
+    tour = [start]
+    visited[start] = True
+    for _ in range(n - 1):
+        current = tour[-1]
+        free = [c for c in neighbors[current].tolist() if not visited[c]]
+        if free:
+            following = free[0]
+        else:
+            d = ((points - points[current]) ** 2).sum(axis=1)
+            d[visited] = np.inf
+            following = int(np.argmin(d))
+        tour.append(following)
+        visited[following] = True
+    return tour
+
+
+def greedy_edge_tour(points, neighbors):
+    """Greedy edge matching on the candidate edges, with the fragments joined by nearest endpoints."""
+    n = len(points)
+    u = np.repeat(np.arange(n), neighbors.shape[1])
+    v = neighbors.ravel()
+    keep = u < v
+    u, v = u[keep], v[keep]
+    order = np.argsort(np.hypot(*(points[u] - points[v]).T), kind="stable")
+
+    parent = list(range(n))
+
+    def find(a):
+        while parent[a] != a:
+            parent[a] = parent[parent[a]]
+            a = parent[a]
+        return a
+
+    degree = [0] * n
+    adj = [[] for _ in range(n)]
+
+    def link(a, b):
+        adj[a].append(b)
+        adj[b].append(a)
+        degree[a] += 1
+        degree[b] += 1
+        parent[find(a)] = find(b)
+
+    for a, b in zip(u[order].tolist(), v[order].tolist()):
+        if degree[a] < 2 and degree[b] < 2 and find(a) != find(b):
+            link(a, b)
+
+    # join the fragments: from the end of one, to the nearest free end of another
+    ends = [c for c in range(n) if degree[c] < 2]
+    while len(ends) > 2 or (len(ends) == 2 and find(ends[0]) != find(ends[1])):
+        a = ends[0]
+        others = np.array([c for c in ends if find(c) != find(a)])
+        b = int(others[np.argmin(((points[others] - points[a]) ** 2).sum(axis=1))])
+        link(a, b)
+        ends = [c for c in ends if degree[c] < 2]
+    link(*ends)
+
+    tour = [0]
+    previous = -1
+    while len(tour) < n:
+        current = tour[-1]
+        following = next(c for c in adj[current] if c != previous)
+        previous = current
+        tour.append(following)
+    return tour
+
+
+class _Tour:
+    """Array tour with city positions, for the local search."""
+
+    def __init__(self, tour, points):
+        self.order = list(tour)
+        self.n = len(self.order)
+        self.pos = [0] * self.n
+        for i, c in enumerate(self.order):
+            self.pos[c] = i
+        self.x = points[:, 0].tolist()
+        self.y = points[:, 1].tolist()
+
+    def d(self, a, b):
+        return math.hypot(self.x[a] - self.x[b], self.y[a] - self.y[b])
+
+    def succ(self, a):
+        return self.order[(self.pos[a] + 1) % self.n]
+
+    def pred(self, a):
+        return self.order[self.pos[a] - 1]
+
+    def reverse(self, a, b):
+        """Reverse the path from a forward to b (or, if shorter, the rest of the tour)."""
+        i, j = self.pos[a], self.pos[b]
+        length = (j - i) % self.n + 1
+        if 2 * length > self.n:
+            i, j = (j + 1) % self.n, (i - 1) % self.n
+            length = self.n - length
+        for _ in range(length // 2):
+            ci, cj = self.order[i], self.order[j]
+            self.order[i], self.order[j] = cj, ci
+            self.pos[cj], self.pos[ci] = i, j
+            i = (i + 1) % self.n
+            j = (j - 1) % self.n
+
+    def move_segment(self, segment, after, reverse):
+        """Move the consecutive cities segment to just after city after, optionally reversed.
+
+        Only the segment and the shorter of the two paths between it and its
+        new place are rewritten: moving it forward past q..after is the same
+        tour as moving it backward past succ(after)..p.
+        """
+        moved = segment[::-1] if reverse else segment
+        p, q = self.pred(segment[0]), self.succ(segment[-1])
+        x = self.succ(after)
+        forward = (self.pos[after] - self.pos[q]) % self.n + 1
+        backward = self.n - len(segment) - forward
+        if forward <= backward:
+            start = self.pos[segment[0]]
+            block = [self.order[(self.pos[q] + s) % self.n] for s in range(forward)] + moved
+        else:
+            start = self.pos[x]
+            block = moved + [self.order[(self.pos[x] + s) % self.n] for s in range(backward)]
+        for s, c in enumerate(block):
+            i = (start + s) % self.n
+            self.order[i] = c
+            self.pos[c] = i
+
+
+def _two_opt_move(t, a, neighbors):
+    """Apply an improving 2-opt move at city a, if its neighbour list has one. Returns the touched cities."""
+    for forward in (True, False):
+        b = t.succ(a) if forward else t.pred(a)
+        d_ab = t.d(a, b)
+        for c in neighbors[a]:
+            d_ac = t.d(a, c)
+            if d_ac >= d_ab - EPS:
+                break
+            e = t.succ(c) if forward else t.pred(c)
+            if c == a or c == b or e == a:
+                continue
+            if d_ab + t.d(c, e) - d_ac - t.d(b, e) > EPS:
+                if forward:
+                    t.reverse(b, c)
+                else:
+                    t.reverse(c, b)
+                return (a, b, c, e)
+    return None
+
+
+def _or_opt_move(t, a, neighbors, max_length=3):
+    """Apply an improving move of the run of 1..max_length cities starting at a. Returns the touched cities."""
+    for length in range(1, max_length + 1):
+        if length + 2 >= t.n:
+            break
+        segment = [t.order[(t.pos[a] + s) % t.n] for s in range(length)]
+        first, last = segment[0], segment[-1]
+        p, q = t.pred(first), t.succ(last)
+        removed = t.d(p, first) + t.d(last, q) - t.d(p, q)
+        inside = set(segment)
+        for end in (first, last):
+            for c in neighbors[end]:
+                if c == a or c in inside:
+                    continue
+                for e in (t.succ(c), t.pred(c)):
+                    if e in inside or {c, e} == {p, q}:
+                        continue
+                    # c - first ... last - e, or c - last ... first - e
+                    kept = t.d(c, first) + t.d(last, e) if end == first else t.d(c, last) + t.d(first, e)
+                    if removed - (kept - t.d(c, e)) > EPS:
+                        after = c if e == t.succ(c) else e
+                        # the city the segment goes after must face its own end
+                        near_after = (end == first) == (after == c)
+                        t.move_segment(segment, after, not near_after)
+                        return (p, q, c, e, first, last)
+    return None
+
+
+def improve_tour(points, tour, neighbors, or_opt=True):
+    """2-opt and Or-opt over the neighbour lists with don't-look bits, until no move improves the tour."""
+    t = _Tour(tour, points)
+    if t.n < 5:
+        return t.order
+    neighbors = neighbors.tolist()
+    queue = deque(t.order)
+    active = [True] * t.n
+    while queue:
+        a = queue.popleft()
+        active[a] = False
+        touched = _two_opt_move(t, a, neighbors) or (or_opt and _or_opt_move(t, a, neighbors))
+        if touched:
+            for c in touched:
+                if not active[c]:
+                    active[c] = True
+                    queue.append(c)
+    return t.order
+
+
+def solve_tsp_heuristic(coords, k=10, construction="greedy", or_opt=True):
+    """Construct a tour and improve it. Returns (tour, length).
+
+    coords is an (n, 2) array or a {city: (x, y)} dict (cities in its key
+    order); construction is "greedy" (greedy edge) or "nearest" (nearest
+    neighbour).
+    """
+    if isinstance(coords, dict):
+        coords = [coords[c] for c in coords]
+    points = np.asarray(coords, dtype=float)
+    n = len(points)
+    if n <= 3:
+        tour = list(range(n))
+        return tour, tour_length(points, tour) if n else 0.0
+    neighbors = neighbor_lists(points, k)
+    if construction == "greedy":
+        tour = greedy_edge_tour(points, neighbors)
+    else:
+        tour = nearest_neighbor_tour(points, neighbors)
+    tour = improve_tour(points, tour, neighbors, or_opt)
+    return tour, tour_length(points, tour)